@@ -0,0 +1,36 @@
+# _fastpath.py
+"""
+Numba-kompilerte kjerner for de varme løkkene i data_provider.
+
+Importeres valgfritt: uten numba (eller numpy) feiler importen, og data_provider
+faller tilbake til sin egen NumPy/Python-versjon med samme grensesnitt.
+"""
+import numpy as np
+from numba import njit
+
+# Indekser inn i data_provider._GUESS_CONDITIONS
+REGN, SNO, SKYET, DELVIS_SKYET = 0, 1, 2, 3
+
+
+@njit(cache=True)
+def classify(temps, precips):
+    """
+    temps/precips: float64-arrays der manglende verdier er NaN.
+    Returnerer (condition_id int8-array, precips med NaN -> 0.0).
+    """
+    n = temps.shape[0]
+    cond = np.empty(n, dtype=np.int8)
+    clean = np.empty(n, dtype=np.float64)
+    for i in range(n):
+        p = precips[i]
+        if p != p:
+            p = 0.0
+        clean[i] = p
+        t = temps[i]
+        if p >= 2.5:
+            cond[i] = REGN if (t != t or t > 1.5) else SNO
+        elif t <= -1.5:  # NaN sammenlignes alltid som False
+            cond[i] = SKYET
+        else:
+            cond[i] = DELVIS_SKYET
+    return cond, clean
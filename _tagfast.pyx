@@ -0,0 +1,48 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+# _tagfast.pyx
+"""
+Cython-versjon av token-oppslaget i data_provider.enrich_events_with_tags.
+
+Kompileres ved første import via pyximport (krever Cython og en C-kompilator).
+Uten dem bruker data_provider sin egen Python-versjon med samme grensesnitt,
+og varianten må gi nøyaktig samme tupler som data_provider._variants_for_token.
+"""
+
+cdef dict _variant_cache = {}
+
+
+cpdef tuple variants_for_token(str p):
+    """Normaliserte varianter av p (trimmet, uten ':', små bokstaver, Capitalize, Title)."""
+    cdef tuple out = _variant_cache.get(p)
+    cdef str s, base
+    if out is not None:
+        return out
+    s = " ".join(p.split())
+    base = s.rstrip(":")
+    out = tuple([v for v in dict.fromkeys((s, base, s.lower(), base.lower(), s.capitalize(), s.title())) if v])
+    if len(_variant_cache) >= 4096:
+        _variant_cache.clear()
+    _variant_cache[p] = out
+    return out
+
+
+cpdef list enrich_tokens(list tokens, dict lookup):
+    """
+    [(token, oppslag eller None, varianter)] for tokens med lengde 2..30.
+    Første variant (eller variant.lower()) som finnes i lookup vinner.
+    """
+    cdef list out = []
+    cdef str t, c
+    cdef tuple variants
+    cdef object entry
+    for t in tokens:
+        if len(t) > 30 or len(t) < 2:
+            continue
+        variants = variants_for_token(t)
+        entry = None
+        for c in variants:
+            entry = lookup.get(c) or lookup.get(c.lower())
+            if entry:
+                break
+        out.append((t, entry or None, variants))
+    return out
@@ -1,6 +1,19 @@
 import os
+import json
+import shutil
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
-from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from datetime import datetime, timedelta
+
+# aiohttp is optional; without it we fall back to the thread pool below
+try:
+    import aiohttp
+except Exception:
+    aiohttp = None
 
 # --- Configuration copied from layout_renderer.py ---
 # Ensure these match the paths used by the renderer script
@@ -35,6 +48,34 @@ KNOWN_MATERIAL_SYMBOLS = [
 ]
 # -----------------------------------------------------------------------------------
 
+def _normalize(icon_base_name):
+    return icon_base_name.lower().replace('-', '_')
+
+# Normalized once, duplicates/aliases dropped (order kept) so no icon is fetched twice
+ICONS = tuple(dict.fromkeys(_normalize(n) for n in KNOWN_MATERIAL_SYMBOLS))
+# {name: (download_url, file_path)}
+_PATHS = {n: (MD_ICONS_BASE_URL + n + '.png', os.path.join(ICONS_DIR, n + '.png')) for n in ICONS}
+
+USER_AGENT = "InkyFrameCalendar/1.0"
+MAX_WORKERS = 16  # matches the adapter's pool_maxsize
+# ETag/Last-Modified per icon, used to revalidate with a 304 instead of a full download
+ETAGS_PATH = os.path.join(ICONS_DIR, ".etags.json")
+# {name: ISO timestamp} of icons the server didn't have; re-probed after FAILED_TTL
+FAILED_PATH = os.path.join(ICONS_DIR, ".failed_icons.json")
+FAILED_TTL = timedelta(days=7)
+# Only these mean the icon really isn't there; 429/5xx etc. are retried on the next run
+NOT_FOUND_STATUSES = (404, 410)
+
+_print_lock = threading.Lock()
+
+def _make_session():
+    """Build one keep-alive session so every icon reuses the same TLS connection."""
+    session = requests.Session()
+    retries = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=16, max_retries=retries))
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
 def _ensure_icon_dir():
     """Ensure the icons directory exists."""
     if not os.path.exists(ICONS_DIR):
@@ -46,68 +87,269 @@ def _ensure_icon_dir():
             return False
     return True
 
-def download_all_icons(icon_list):
+def _remove_partial_downloads():
+    """Delete *.part leftovers from an interrupted run."""
+    try:
+        with os.scandir(ICONS_DIR) as it:
+            for entry in it:
+                if entry.name.endswith('.part') and entry.is_file():
+                    try:
+                        os.remove(entry.path)
+                    except OSError as e:
+                        print(f"[WARN] Could not remove {entry.path}: {e}")
+    except OSError:
+        pass
+
+def _log(msg):
+    """Print one line at a time so output from worker threads doesn't interleave."""
+    with _print_lock:
+        print(msg)
+
+def _icon_paths(icon_base_name):
+    """Return (name, download_url, file_path) for an icon name."""
+    paths = _PATHS.get(icon_base_name)
+    if paths is None:
+        icon_base_name = _normalize(icon_base_name)
+        paths = _PATHS.get(icon_base_name) or (
+            MD_ICONS_BASE_URL + icon_base_name + '.png',
+            os.path.join(ICONS_DIR, icon_base_name + '.png'))
+    return (icon_base_name,) + paths
+
+def _load_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+def _save_json(path, data):
+    """Write a state file atomically so a crash never leaves half a JSON file."""
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        os.replace(tmp, path)
+    except Exception as e:
+        print(f"[WARN] Could not save {path}: {e}")
+
+def _recently_failed(failed, icon_base_name):
+    stamp = failed.get(icon_base_name)
+    if not stamp:
+        return False
+    try:
+        return datetime.now() - datetime.fromisoformat(stamp) < FAILED_TTL
+    except Exception:
+        return False
+
+def _conditional_headers(validators):
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+def _remember_validators(etags, icon_base_name, headers):
+    etag = headers.get("ETag")
+    last_modified = headers.get("Last-Modified")
+    if etag or last_modified:
+        etags[icon_base_name] = {"etag": etag, "last_modified": last_modified}
+
+def _stored_validators(etags, icon_base_name, file_path):
+    # A 304 only means something if the PNG is still on disk; otherwise drop the entry and refetch
+    if os.path.exists(file_path):
+        return etags.get(icon_base_name)
+    etags.pop(icon_base_name, None)
+    return None
+
+def _cached_result(icon_base_name, file_path, failed, validators=None):
+    """
+    True/False if a previous run already decided this icon, None if it must be fetched.
+    With validators an existing icon is not skipped but revalidated by a conditional GET.
+    """
+    if os.path.exists(file_path):
+        if validators:
+            return None
+        _log(f"  [SKIP] {icon_base_name}.png already exists locally.")
+        return True
+
+    if _recently_failed(failed, icon_base_name):
+        _log(f"  [SKIP] {icon_base_name}.png previously failed to download (404 cached).")
+        return False
+    return None
+
+def _save_icon(icon_base_name, file_path, failed, content):
+    """
+    content is either bytes or a readable stream (e.g. response.raw) copied in 64 KB chunks.
+    Written to a .part file and renamed into place, so a crash never leaves a truncated
+    PNG that the next run would skip as "already exists".
+    """
+    tmp = file_path + '.part'
+    try:
+        with open(tmp, 'wb') as f:
+            if hasattr(content, "read"):
+                shutil.copyfileobj(content, f, 64 * 1024)
+            else:
+                f.write(content)
+        os.replace(tmp, file_path)
+    except Exception:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+        
+    _log(f"  [OK] Downloaded and cached {icon_base_name}.png")
+    failed.pop(icon_base_name, None) # Clear failure cache on success
+
+def _mark_not_found(icon_base_name, failed, status):
+    # Cache this failure to prevent repeat requests for missing icons
+    failed[icon_base_name] = datetime.now().isoformat()
+    _log(f"  [FAIL] {icon_base_name}.png not found (HTTP Error {status}).")
+
+def _log_transient(icon_base_name, status):
+    # Not cached in .failed_icons.json, so the next run tries again
+    _log(f"  [ERROR] {icon_base_name}.png: HTTP {status}, will retry next run.")
+
+def _fetch_one(session, icon_base_name, etags, failed, refresh=False):
+    """
+    Download a single icon into ICONS_DIR.
+    Returns (icon_base_name, ok) where ok is True for cached/downloaded icons.
+    """
+    icon_base_name, download_url, file_path = _icon_paths(icon_base_name)
+    validators = _stored_validators(etags, icon_base_name, file_path) if refresh else None
+    cached = _cached_result(icon_base_name, file_path, failed, validators)
+    if cached is not None:
+        return icon_base_name, cached
+
+    headers = _conditional_headers(validators) if validators else {}
+    try:
+        if not validators:
+            # Cheap pre-flight for icons we don't have yet: a missing file costs only headers
+            head = session.head(download_url, timeout=3, allow_redirects=True)
+            if head.status_code in NOT_FOUND_STATUSES:
+                _mark_not_found(icon_base_name, failed, head.status_code)
+                return icon_base_name, False
+            if head.status_code != 200:
+                _log_transient(icon_base_name, head.status_code)
+                return icon_base_name, False
+        # stream=True: the body goes socket -> file without being buffered in memory first
+        with session.get(download_url, headers=headers, timeout=5, stream=True) as response:
+            if response.status_code == 304:
+                _log(f"  [FRESH] {icon_base_name}.png not modified on server.")
+                return icon_base_name, True
+            response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
+            response.raw.decode_content = True # undo gzip/deflate if the server used it
+            _save_icon(icon_base_name, file_path, failed, response.raw)
+            _remember_validators(etags, icon_base_name, response.headers)
+        return icon_base_name, True
+
+    except requests.exceptions.HTTPError as err:
+        if err.response.status_code in NOT_FOUND_STATUSES:
+            _mark_not_found(icon_base_name, failed, err.response.status_code)
+        else:
+            _log_transient(icon_base_name, err.response.status_code)
+    except requests.exceptions.RequestException as err:
+        _log(f"  [ERROR] Connection error for {icon_base_name}: {err}")
+    except Exception as e:
+        _log(f"  [ERROR] Unexpected error saving icon {icon_base_name}: {e}")
+    return icon_base_name, False
+
+def _download_with_threads(icon_list, etags, failed, refresh=False):
+    session = _make_session()
+    try:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+            futures = [ex.submit(_fetch_one, session, name, etags, failed, refresh) for name in icon_list]
+            return [fut.result() for fut in as_completed(futures)]
+    finally:
+        session.close()
+
+async def _fetch_one_async(session, sem, icon_base_name, etags, failed, refresh=False):
+    """aiohttp twin of _fetch_one; file writes are pushed to the default executor."""
+    icon_base_name, download_url, file_path = _icon_paths(icon_base_name)
+    validators = _stored_validators(etags, icon_base_name, file_path) if refresh else None
+    cached = _cached_result(icon_base_name, file_path, failed, validators)
+    if cached is not None:
+        return icon_base_name, cached
+
+    headers = _conditional_headers(validators) if validators else {}
+    loop = asyncio.get_running_loop()
+    try:
+        if not validators:
+            async with sem, session.head(download_url, allow_redirects=True) as head:
+                if head.status in NOT_FOUND_STATUSES:
+                    _mark_not_found(icon_base_name, failed, head.status)
+                    return icon_base_name, False
+                if head.status != 200:
+                    _log_transient(icon_base_name, head.status)
+                    return icon_base_name, False
+        async with sem, session.get(download_url, headers=headers) as response:
+            if response.status == 304:
+                _log(f"  [FRESH] {icon_base_name}.png not modified on server.")
+                return icon_base_name, True
+            if response.status in NOT_FOUND_STATUSES:
+                _mark_not_found(icon_base_name, failed, response.status)
+                return icon_base_name, False
+            if response.status >= 400:
+                _log_transient(icon_base_name, response.status)
+                return icon_base_name, False
+            content = await response.read()
+            resp_headers = response.headers
+        await loop.run_in_executor(None, _save_icon, icon_base_name, file_path, failed, content)
+        _remember_validators(etags, icon_base_name, resp_headers)
+        return icon_base_name, True
+    except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+        _log(f"  [ERROR] Connection error for {icon_base_name}: {err}")
+    except Exception as e:
+        _log(f"  [ERROR] Unexpected error saving icon {icon_base_name}: {e}")
+    return icon_base_name, False
+
+async def _download_with_aiohttp(icon_list, etags, failed, refresh=False):
+    connector = aiohttp.TCPConnector(limit=MAX_WORKERS, limit_per_host=MAX_WORKERS, keepalive_timeout=30)
+    timeout = aiohttp.ClientTimeout(total=5)
+    sem = asyncio.Semaphore(MAX_WORKERS)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                     headers={"User-Agent": USER_AGENT}) as session:
+        return await asyncio.gather(*[_fetch_one_async(session, sem, n, etags, failed, refresh) for n in icon_list])
+
+def download_all_icons(icon_list, refresh=False):
     """
     Attempts to download a list of icons from the remote source and cache them locally.
+    Uses a single aiohttp event loop when aiohttp is installed, otherwise a thread pool
+    over the shared keep-alive requests session.
+
+    refresh=True revalidates already cached icons with If-None-Match/If-Modified-Since,
+    so unchanged icons cost a 304 instead of a full download.
     """
     if not _ensure_icon_dir():
         return
 
-    success_count = 0
-    fail_count = 0
-    
     print(f"\n--- Starting icon download from: {MD_ICONS_BASE_URL} ---")
+    _remove_partial_downloads()
 
-    for icon_base_name in icon_list:
-        icon_base_name = icon_base_name.lower().replace('-', '_')
-        md_filename = f"{icon_base_name}.png"
-        download_url = MD_ICONS_BASE_URL + md_filename 
-        file_path = os.path.join(ICONS_DIR, f"{icon_base_name}.png")
-        fail_path = os.path.join(ICONS_DIR, f"{icon_base_name}.png.404_fail")
-
-        if os.path.exists(file_path):
-            print(f"  [SKIP] {icon_base_name}.png already exists locally.")
-            success_count += 1
-            continue
+    # Callers may pass their own list; normalize and dedupe it the same way as ICONS
+    if icon_list is not ICONS:
+        icon_list = tuple(dict.fromkeys(_normalize(n) for n in icon_list))
 
-        if os.path.exists(fail_path):
-            print(f"  [SKIP] {icon_base_name}.png previously failed to download (404 cached).")
-            fail_count += 1
-            continue
+    etags = _load_json(ETAGS_PATH)
+    failed = _load_json(FAILED_PATH)
+    try:
+        if aiohttp is not None:
+            results = asyncio.run(_download_with_aiohttp(icon_list, etags, failed, refresh))
+        else:
+            results = _download_with_threads(icon_list, etags, failed, refresh)
+    finally:
+        _save_json(ETAGS_PATH, etags)
+        _save_json(FAILED_PATH, failed)
 
-        try:
-            response = requests.get(download_url, timeout=5)
-            response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
+    success_count = sum(1 for _, ok in results if ok)
+    fail_count = len(results) - success_count
 
-            with open(file_path, 'wb') as f:
-                f.write(response.content)
-                
-            print(f"  [OK] Downloaded and cached {icon_base_name}.png")
-            success_count += 1
-            
-            if os.path.exists(fail_path):
-                os.remove(fail_path) # Clear failure cache on success
-
-        except requests.exceptions.HTTPError as err:
-            # Cache this failure to prevent repeat requests for missing icons
-            try:
-                with open(fail_path, 'w') as f:
-                    f.write(str(datetime.now()))
-            except Exception:
-                pass
-            print(f"  [FAIL] {icon_base_name}.png not found (HTTP Error {err.response.status_code}).")
-            fail_count += 1
-        except requests.exceptions.RequestException as err:
-            print(f"  [ERROR] Connection error for {icon_base_name}: {err}")
-            fail_count += 1
-        except Exception as e:
-            print(f"  [ERROR] Unexpected error saving icon {icon_base_name}: {e}")
-            fail_count += 1
-            
     print(f"\n--- Icon Download Summary ---")
     print(f"Successful downloads: {success_count}")
     print(f"Failures (404/Connection): {fail_count}")
     print(f"Check the '{ICONS_DIR}' directory to see available icons.")
 
 if __name__ == '__main__':
-    download_all_icons(KNOWN_MATERIAL_SYMBOLS)
\ No newline at end of file
+    import sys
+    download_all_icons(ICONS, refresh="--refresh" in sys.argv[1:])
\ No newline at end of file
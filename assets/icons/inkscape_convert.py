@@ -1,10 +1,24 @@
-import subprocess
 import os
-INKSCAPE_PATH = r"C:\Program Files\Inkscape\bin\inkscape.exe"
+from concurrent.futures import ThreadPoolExecutor
+
+# resvg rasteriserer i samme prosess (samme bibliotek som inky_icons_package bruker),
+# så vi slipper å starte Inkscape for hver fil
+import resvg_py
 
 # Bruker nåværende mappe (der scriptet kjører)
 ICON_DIR = os.getcwd()
+ICON_SIZE = 20
+
+def convert(job):
+    svg_path, png_path = job
+    with open(svg_path, "r", encoding="utf-8") as f:
+        svg_text = f.read()
+    png_data = resvg_py.svg_to_bytes(svg_text, width=ICON_SIZE, height=ICON_SIZE)
+    with open(png_path, "wb") as f:
+        f.write(bytes(png_data))
+    return png_path
 
+jobs = []
 for fn in os.listdir(ICON_DIR):
     if fn.lower().endswith(".svg"):
         svg_path = os.path.join(ICON_DIR, fn)
@@ -15,16 +29,14 @@ for fn in os.listdir(ICON_DIR):
             print(f"⏩ Hopper over (eksisterer allerede): {png_path}")
             continue
 
-        # Kommando for konvertering
-        cmd = [
-            INKSCAPE_PATH,
-            "--export-type=png",
-            "--export-width=20",
-            "--export-height=20",
-            f"--export-filename={png_path}",
-            svg_path
-        ]
+        jobs.append((svg_path, png_path))
 
+if jobs:
+    for svg_path, png_path in jobs:
         print(f"Konverterer: {svg_path} → {png_path}")
-        subprocess.run(cmd, check=True)
-        print(f"✔️ Laget: {png_path}")
+
+    # resvg slipper GIL-en i Rust-koden, så tråder gir ekte parallellitet
+    workers = min(os.cpu_count() or 1, len(jobs))
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        for png_path in ex.map(convert, jobs):
+            print(f"✔️ Laget: {png_path}")
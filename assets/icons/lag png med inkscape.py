@@ -1,25 +1,34 @@
-import subprocess
 import os
+from concurrent.futures import ThreadPoolExecutor
 
-INKSCAPE_PATH = r"C:\Users\a131001\Inkscape Portable\inkscapeportable.exe"
+# resvg rasteriserer i samme prosess, så Inkscape trengs ikke lenger
+import resvg_py
 
 # Bruk nåværende mappe (der du kjører scriptet)
 ICON_DIR = os.getcwd()  # Nåværende arbeidsmappe
+ICON_SIZE = 20
 
+def convert(job):
+    svg_path, png_path = job
+    with open(svg_path, "r", encoding="utf-8") as f:
+        svg_text = f.read()
+    png_data = resvg_py.svg_to_bytes(svg_text, width=ICON_SIZE, height=ICON_SIZE)
+    with open(png_path, "wb") as f:
+        f.write(bytes(png_data))
+    return png_path
+
+jobs = []
 for fn in os.listdir(ICON_DIR):
     if fn.lower().endswith(".svg"):
         svg_path = os.path.join(ICON_DIR, fn)
         png_path = os.path.join(ICON_DIR, os.path.splitext(fn)[0] + ".png")
+        jobs.append((svg_path, png_path))
 
-        cmd = [
-            INKSCAPE_PATH,
-            "--export-type=png",
-            "--export-width=20",
-            "--export-height=20",
-            f"--export-filename={png_path}",
-            svg_path
-        ]
-
+if jobs:
+    for svg_path, png_path in jobs:
         print(f"Konverterer: {svg_path} → {png_path}")
-        subprocess.run(cmd, check=True)
-        print(f"Laget: {png_path}")
\ No newline at end of file
+
+    workers = min(os.cpu_count() or 1, len(jobs))
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        for png_path in ex.map(convert, jobs):
+            print(f"Laget: {png_path}")
\ No newline at end of file
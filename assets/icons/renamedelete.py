@@ -1,4 +1,5 @@
 import os
+import sys
 
 def rename_and_delete_files_in_folder(folder_path):
     """
@@ -10,24 +11,39 @@ def rename_and_delete_files_in_folder(folder_path):
         print(f"The folder '{folder_path}' does not exist.")
         return
 
-    for filename in os.listdir(folder_path):
-        file_path = os.path.join(folder_path, filename)
+    # scandir hands back type info with each entry, so no extra isdir/getsize stat per file.
+    # Collect everything first and only touch the folder after the iterator is closed.
+    to_delete, to_rename = [], []
+    with os.scandir(folder_path) as it:
+        for entry in it:
+            # Skip directories
+            if entry.is_dir(follow_symlinks=False):
+                continue
+            # Already handled by an earlier run (avoids processed_processed_...)
+            if entry.name.startswith("processed_"):
+                continue
+            if entry.stat().st_size == 0:
+                to_delete.append(entry.path)
+            else:
+                to_rename.append(entry.path)
 
-        # Skip directories
-        if os.path.isdir(file_path):
-            continue
+    lines = []
 
-        # Delete empty files
-        if os.path.getsize(file_path) == 0:
-            os.remove(file_path)
-            print(f"Deleted empty file: {filename}")
-            continue
+    # Delete empty files
+    for path in to_delete:
+        os.unlink(path)
+        lines.append(f"Deleted empty file: {os.path.basename(path)}")
 
-        # Rename file
+    # Rename files
+    for old_path in to_rename:
+        filename = os.path.basename(old_path)
         new_filename = f"processed_{filename}"
-        new_file_path = os.path.join(folder_path, new_filename)
-        os.rename(file_path, new_file_path)
-        print(f"Renamed file: {filename} -> {new_filename}")
+        os.rename(old_path, os.path.join(folder_path, new_filename))
+        lines.append(f"Renamed file: {filename} -> {new_filename}")
+
+    # One write instead of a print (and flush) per file
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
 
 # Use the folder where this script is located
 current_folder = os.path.dirname(os.path.abspath(__file__))
@@ -14,10 +14,22 @@ Kjør som skript for rask feilsøking:
   python data_provider.py
 """
 import os
+import time
+import pickle
+import json
+import copy
+import hashlib
+import functools
+import bisect
+import threading
 import requests
-from datetime import datetime, timedelta, timezone
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, NamedTuple, Optional
+from urllib.parse import quote
 import re
-from PIL import ImageColor
 
 try:
     from zoneinfo import ZoneInfo
@@ -25,8 +37,55 @@ try:
 except Exception:
     TZ = None
 
-from dotenv import load_dotenv
-load_dotenv()
+try:
+    import orjson  # optional: 2-3x faster JSON parsing
+    _loads = orjson.loads
+except Exception:
+    _loads = json.loads
+
+try:
+    import ijson  # optional: stream-parse big JSON bodies instead of building the whole tree
+except Exception:
+    ijson = None
+
+try:
+    import ahocorasick  # optional (pyahocorasick): C automaton for substring key matching
+except Exception:
+    ahocorasick = None
+
+# Refuse JSON bodies larger than this (bytes) instead of loading them
+MAX_JSON_BYTES = 5 * 1024 * 1024
+
+try:
+    import fcntl  # POSIX only; without it the disk cache just skips file locking
+except Exception:
+    fcntl = None
+
+# python-dotenv is only imported when there is a .env to read (saves import time on the Pi)
+if any(os.path.exists(os.path.join(d, ".env")) for d in (os.getcwd(), os.path.dirname(os.path.abspath(__file__)))):
+    from dotenv import load_dotenv
+    load_dotenv()
+
+_ImageColor = None
+
+
+def _imagecolor():
+    """PIL.ImageColor, imported on first use: only colour-name lookups need it."""
+    global _ImageColor
+    if _ImageColor is None:
+        from PIL import ImageColor
+        _ImageColor = ImageColor
+    return _ImageColor
+
+
+@functools.lru_cache(maxsize=256)
+def _getrgb_cached(name):
+    """ImageColor.getrgb(name) as an (r, g, b) tuple, or None if PIL can't parse it."""
+    try:
+        rgb = _imagecolor().getrgb(name)
+        return (int(rgb[0]), int(rgb[1]), int(rgb[2]))
+    except Exception:
+        return None
 
 # --- Konfig fra miljøvariabler (fallbacks for enkel testing) ---
 API_KEY_GOOGLE = os.environ.get("API_KEY_GOOGLE", "")
@@ -45,6 +104,14 @@ MOVAR_HUSNR = os.environ.get("MOVAR_HUSNR", "")
 # Hvor mange dager vi viser standard
 DEFAULT_DAYS = int(os.environ.get("DEFAULT_DAYS", "14"))
 
+# Skriv ut vær-debug (timeforhåndsvisning + periodevalg) i initial_fetch_all
+_DEBUG_WEATHER = os.environ.get("DEBUG_WEATHER") == "1"
+# time på døgnet -> periode for debug-periodevalget
+_PERIOD_BY_HOUR = tuple(
+    "morning" if 6 <= h <= 10 else "lunch" if 11 <= h <= 13 else "day" if 14 <= h <= 17 else "evening"
+    for h in range(24)
+)
+
 
 # --- Configuration ---
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "")
@@ -87,23 +154,181 @@ def _format_birthday_display(text: str):
     return f"{name} {age} år"
 
 
+# Set ENABLE_AI_ICONS=0 to never call OpenAI (e.g. on the e-paper refresh path)
+ENABLE_AI_ICONS = os.environ.get("ENABLE_AI_ICONS", "1") == "1"
+
+# Earlier AI answers, {summary: icon}, persisted so a restart doesn't pay for known strings again
+AI_ICON_CACHE_PATH = os.environ.get("AI_ICON_CACHE_PATH", "ai_icon_cache.json")
+# Summaries OpenAI gave no icon for, {summary: unix time}; not asked again until AI_ICON_MISS_TTL has passed
+AI_ICON_MISS_PATH = os.environ.get("AI_ICON_MISS_PATH", "ai_icon_misses.json")
+AI_ICON_MISS_TTL = 24 * 3600
+_ai_icon_cache = None
+_ai_icon_misses = None
+_ai_icon_cache_lock = threading.Lock()
+
+
+def _load_json_dict(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return dict(json.load(f))
+    except Exception:
+        return {}
+
+
+def _save_json_dict(path, data):
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp, path)
+    except Exception as e:
+        print(f"[AI Icon] Could not save {path}: {e}")
+
+
+def _load_ai_icon_cache():
+    global _ai_icon_cache, _ai_icon_misses
+    if _ai_icon_cache is None:
+        _ai_icon_cache = _load_json_dict(AI_ICON_CACHE_PATH)
+        now = time.time()
+        _ai_icon_misses = {k: v for k, v in _load_json_dict(AI_ICON_MISS_PATH).items()
+                           if isinstance(v, (int, float)) and now - v < AI_ICON_MISS_TTL}
+    return _ai_icon_cache
+
+
+def _ai_recently_missed(summary):
+    """Call with _ai_icon_cache_lock held, after _load_ai_icon_cache()."""
+    stamp = _ai_icon_misses.get(summary)
+    return stamp is not None and time.time() - stamp < AI_ICON_MISS_TTL
+
+
+def _store_ai_answers(answers, asked):
+    """Persist answers, and remember every asked summary without an answer as a miss."""
+    now = time.time()
+    with _ai_icon_cache_lock:
+        _load_ai_icon_cache()
+        if answers:
+            _ai_icon_cache.update(answers)
+            _save_json_dict(AI_ICON_CACHE_PATH, _ai_icon_cache)
+        misses = [s for s in asked if s not in answers]
+        if misses:
+            _ai_icon_misses.update((s, now) for s in misses)
+            _save_json_dict(AI_ICON_MISS_PATH, _ai_icon_misses)
+
+
 def get_ai_suggested_icon(summary: str):
     """
     Uses OpenAI to suggest a Lucide icon name.
     Input text is often in Norwegian.
+    Answers are memoized per summary (in memory and in AI_ICON_CACHE_PATH); summaries
+    without an answer are not retried for AI_ICON_MISS_TTL.
     """
-    if not OPENAI_API_KEY:
+    if not OPENAI_API_KEY or not ENABLE_AI_ICONS:
         # We don't print here to avoid spamming if the key is missing
         return None
 
+    with _ai_icon_cache_lock:
+        cached = _load_ai_icon_cache().get(summary)
+        if not cached and _ai_recently_missed(summary):
+            return None
+    if cached:
+        return cached
+
+    suggestion = _ask_openai_for_icon(summary)
+    _store_ai_answers({summary: suggestion} if suggestion else {}, [summary])
+    return suggestion
+
+
+# One OpenAI client (and connection pool) per process instead of one per lookup
+_openai_client = None
+OPENAI_TIMEOUT = 3  # never let an icon lookup stall a render for long
+
+
+def _get_openai_client():
+    global _openai_client
+    if _openai_client is None and OPENAI_API_KEY:
+        from openai import OpenAI
+        _openai_client = OpenAI(api_key=OPENAI_API_KEY, timeout=OPENAI_TIMEOUT)
+    return _openai_client
+
+
+def _model_for_summary(summary):
+    """Short summaries are easy; only longer (often ambiguous) Norwegian phrases get the stronger model."""
+    return "gpt-4o-mini" if len(summary.split()) > 2 else "gpt-3.5-turbo"
+
+
+def get_ai_suggested_icons(summaries):
+    """
+    Batch version of get_ai_suggested_icon: returns {summary: icon} for the given summaries.
+    Cached answers are used as-is; all misses go to OpenAI in ONE request.
+    """
+    if not OPENAI_API_KEY or not ENABLE_AI_ICONS or not summaries:
+        return {}
+
+    with _ai_icon_cache_lock:
+        cache = _load_ai_icon_cache()
+        found = {s: cache[s] for s in summaries if cache.get(s)}
+        missing = [s for s in dict.fromkeys(summaries) if s not in found and not _ai_recently_missed(s)]
+    if not missing:
+        return found
+    if len(missing) == 1:
+        icon = get_ai_suggested_icon(missing[0])
+        if icon:
+            found[missing[0]] = icon
+        return found
+
+    answers = _ask_openai_for_icons(missing)
+    found.update(answers)
+    _store_ai_answers(answers, missing)
+    return found
+
+
+def _ask_openai_for_icons(summaries):
+    print(f"[AI Icon] No local mapping for {len(summaries)} events. Asking OpenAI in one batch...")
+    try:
+        client = _get_openai_client()
+        lines = "\n".join(f"{i + 1}. {s}" for i, s in enumerate(summaries))
+        response = client.chat.completions.create(
+            model="gpt-4o-mini" if any(len(s.split()) > 2 for s in summaries) else "gpt-3.5-turbo",
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You map calendar events to Lucide icon names. For each numbered line return the single most relevant lowercase icon name (e.g. 'utensils', 'car', 'users'). Prefer filled icons that will be returned well on a e-ink screen. The input is in Norwegian. Return ONLY a JSON array of strings, one per line, in the same order. No explanation."
+                },
+                {"role": "user", "content": lines}
+            ],
+            temperature=0,
+            max_tokens=8 * len(summaries) + 10,
+            timeout=OPENAI_TIMEOUT,
+            stream=False
+        )
+        text = response.choices[0].message.content.strip()
+        # Tolerate ```json fences around the array
+        text = text[text.find("["):text.rfind("]") + 1]
+        names = json.loads(text)
+        if not isinstance(names, list) or len(names) != len(summaries):
+            print(f"[AI Icon Error] Batch answer did not match the {len(summaries)} events: {text[:200]}")
+            return {}
+        out = {}
+        for summary, name in zip(summaries, names):
+            name = str(name or "").strip().lower()
+            if name:
+                out[summary] = name.split()[0].replace(".", "").replace("'", "")
+        print(f"[AI Icon] SUCCESS: Got {len(out)} icons in one request")
+        return out
+    except Exception as e:
+        print(f"[AI Icon Error] {e}")
+        return {}
+
+
+def _ask_openai_for_icon(summary: str):
+
     # This log tells you the fallback is actually starting
     print(f"[AI Icon] No local mapping for '{summary}'. Asking OpenAI...")
     
     try:
-        from openai import OpenAI
-        client = OpenAI(api_key=OPENAI_API_KEY)
+        client = _get_openai_client()
         response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
+            model=_model_for_summary(summary),
             messages=[
                 {
                     "role": "system", 
@@ -112,7 +337,9 @@ def get_ai_suggested_icon(summary: str):
                 {"role": "user", "content": f"Event: {summary}"}
             ],
             temperature=0,
-            max_tokens=10
+            max_tokens=4,  # icon names are one or two tokens
+            timeout=OPENAI_TIMEOUT,
+            stream=False
         )
         suggestion = response.choices[0].message.content.strip().lower()
         # Clean up potential extra words or dots
@@ -124,18 +351,78 @@ def get_ai_suggested_icon(summary: str):
         return None
 
 
-# Try to import mapping helpers (non-fatal)
+# symbol_code hint -> friendly word; first match wins, so the order matters
+# (e.g. 'partlycloudy' must hit "partly" before "cloud")
+_COND_RULES = (
+    ("clear", "Klarvær"),
+    ("fair", "Delvis skyet"), ("partly", "Delvis skyet"),
+    ("cloud", "Skyet"), ("overcast", "Skyet"),
+    ("rain", "Regn"), ("shower", "Regn"), ("drizzle", "Regn"),
+    ("snow", "Snø"),
+    ("sleet", "Sludd"),
+    ("thunder", "Torden"), ("tstorm", "Torden"),
+)
+_cond_by_symbol = {}
+
+
+def _condition_for_symbol(symbol_code):
+    """Map a met.no symbol_code to a condition word; memoized since there are only a few dozen codes."""
+    cond = _cond_by_symbol.get(symbol_code)
+    if cond is None:
+        sc = symbol_code.lower()
+        cond = next((v for k, v in _COND_RULES if k in sc), symbol_code)
+        _cond_by_symbol[symbol_code] = cond
+    return cond
+
+
+# Fallback conditions when an hour has no symbol_code; classify() returns indexes into this
+_GUESS_CONDITIONS = ("Regn", "Snø", "Skyet", "Delvis skyet")
+
+
+def _classify_py(temps, precips):
+    """NumPy twin of _fastpath.classify: (condition ids, precips with NaN -> 0.0)."""
+    precips = np.nan_to_num(precips)
+    wet = precips >= 2.5
+    cond = np.select([wet & (np.isnan(temps) | (temps > 1.5)), wet, temps <= -1.5], [0, 1, 2], default=3)
+    return cond, precips
+
+
+# numpy / numba are optional and slow to import, so they are loaded on the first parse
+np = None
+classify = None
+_numeric_loaded = False
+
+
+def _load_numeric():
+    global np, classify, _numeric_loaded
+    if not _numeric_loaded:
+        _numeric_loaded = True
+        try:
+            import numpy
+            np = numpy
+        except Exception:
+            return
+        try:
+            from _fastpath import classify as _jit_classify  # numba JIT, optional
+            classify = _jit_classify
+        except Exception:
+            classify = _classify_py
+
+
 def parse_locationforecast_timeseries(timeseries):
     """
     Convert Locationforecast 'properties.timeseries' into a simple hourly list:
     [{'time': ISO, 'temp': float, 'precip': float, 'symbol_code': str, 'condition': str}, ...]
     """
-    out = []
+    # Pass 1: flatten the JSON into parallel lists
+    times, temps, precips, symbols = [], [], [], []
     for item in (timeseries or []):
         t = item.get("time") or item.get("validTime") or None
 
+        data = item.get("data") or {}
+
         # instant details (air temp etc.)
-        inst = item.get("data", {}).get("instant", {}).get("details", {}) if item.get("data") else item.get("data", {}).get("instant", {}).get("details", {})
+        inst = data.get("instant", {}).get("details", {})
         temp = None
         if inst:
             temp = inst.get("air_temperature") or inst.get("airTemperature") or inst.get("temperature") or inst.get("temp")
@@ -144,7 +431,7 @@ def parse_locationforecast_timeseries(timeseries):
         precip = None
         symbol_code = None
         for key in ("next_1_hours", "next_6_hours", "next_12_hours"):
-            period = item.get("data", {}).get(key) if item.get("data") else item.get(key)
+            period = data.get(key) if data else item.get(key)
             if period:
                 # precipitation amount often under period['details']['precipitation_amount'] or period['details']['precipitation']
                 det = period.get("details", {}) or {}
@@ -158,40 +445,48 @@ def parse_locationforecast_timeseries(timeseries):
 
         # Fallbacks: try top-level summary if period missing
         if not symbol_code:
-            top_summary = item.get("data", {}).get("summary", {}) if item.get("data") else item.get("summary", {})
+            top_summary = data.get("summary", {}) if data else item.get("summary", {})
             symbol_code = top_summary.get("symbol_code") or top_summary.get("symbol") or symbol_code
 
-        # normalize precip and temp types
-        try:
-            precip = float(precip) if precip is not None else 0.0
-        except Exception:
-            precip = 0.0
+        times.append(t)
+        temps.append(temp)
+        precips.append(precip)
+        symbols.append(symbol_code)
+
+    # Pass 2: numbers and fallback conditions for the whole series at once
+    _load_numeric()
+    if np is not None:
         try:
-            temp = float(temp) if temp is not None else None
+            temp_arr = np.array([np.nan if v is None else v for v in temps], dtype=np.float64)
+            precip_arr = np.array([np.nan if v is None else v for v in precips], dtype=np.float64)
+            # if no symbol_code available, fallback: guess from precip/temp
+            cond_ids, precip_arr = classify(temp_arr, precip_arr)
+            guess = [_GUESS_CONDITIONS[c] for c in cond_ids.tolist()]
+            temps = [None if v != v else v for v in temp_arr.tolist()]
+            precips = precip_arr.tolist()
         except Exception:
-            temp = None
+            guess = None  # odd values (strings etc.) -> take the per-item path below
+    else:
+        guess = None
+
+    out = []
+    for i, (t, temp, precip, symbol_code) in enumerate(zip(times, temps, precips, symbols)):
+        if guess is None:
+            # normalize precip and temp types
+            try:
+                precip = float(precip) if precip is not None else 0.0
+            except Exception:
+                precip = 0.0
+            try:
+                temp = float(temp) if temp is not None else None
+            except Exception:
+                temp = None
 
         # condition: map symbol_code into a friendly word
-        cond = None
         if symbol_code:
-            sc = symbol_code.lower()
-            # common symbol name hints: 'clearsky', 'fair', 'partlycloudy', 'cloudy', 'rain', 'lightrain', 'heavyrain', 'snow', 'sleet', 'thunder'
-            if "clear" in sc or "clearsky" in sc:
-                cond = "Klarvær"
-            elif "fair" in sc or "partly" in sc or "partlycloudy" in sc:
-                cond = "Delvis skyet"
-            elif "cloud" in sc or "overcast" in sc:
-                cond = "Skyet"
-            elif "rain" in sc or "shower" in sc or "drizzle" in sc:
-                cond = "Regn"
-            elif "snow" in sc or "snowshow" in sc:
-                cond = "Snø"
-            elif "sleet" in sc:
-                cond = "Sludd"
-            elif "thunder" in sc or "tstorm" in sc:
-                cond = "Torden"
-            else:
-                cond = symbol_code
+            cond = _condition_for_symbol(symbol_code)
+        elif guess is not None:
+            cond = guess[i]
         else:
             # if no symbol_code available, fallback: guess from precip/temp
             if precip >= 2.5:
@@ -249,6 +544,105 @@ def date_string_for_offset(day_index=0):
     return d.strftime("%Y-%m-%d")
 
 
+# --------------------------------------------------------------------
+# Shared HTTP session
+# --------------------------------------------------------------------
+# One keep-alive session for every fetch_* call, so the TLS handshakes to googleapis.com and
+# the Movar API are paid once per process instead of once per call.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=8, pool_maxsize=16,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504)),
+))
+
+
+# --------------------------------------------------------------------
+# TTL cache for the network fetchers (memory -> disk -> network)
+# --------------------------------------------------------------------
+FETCH_CACHE_DIR = os.environ.get("FETCH_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "weekcalendar"))
+FETCH_CACHE_ENABLED = os.environ.get("FETCH_CACHE", "1") != "0"
+
+_fetch_cache_mem = {}
+_fetch_cache_lock = threading.Lock()
+
+
+def _fetch_result_is_empty(value):
+    # The fetchers swallow errors and return empty results; never keep those around.
+    if isinstance(value, tuple):
+        return not value or not value[0]
+    return not value
+
+
+def _fetch_cache_read(path):
+    try:
+        with open(path, "rb") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_SH)
+            return pickle.load(f)
+    except Exception:
+        return None
+
+
+def _fetch_cache_write(path, entry):
+    try:
+        os.makedirs(FETCH_CACHE_DIR, exist_ok=True)
+        with open(path, "ab") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            f.seek(0)
+            f.truncate()
+            pickle.dump(entry, f)
+    except Exception as ex:
+        print("[fetch_cache] could not write", path, ex)
+
+
+def _fetch_cache_store(key, entry, now):
+    """Put entry in the memory cache, dropping expired ones (keys carry the date, so they never repeat)."""
+    with _fetch_cache_lock:
+        for k in [k for k, (expires, _) in _fetch_cache_mem.items() if expires <= now]:
+            del _fetch_cache_mem[k]
+        _fetch_cache_mem[key] = entry
+
+
+def ttl_cached(ttl_seconds):
+    """
+    Cache a fetcher's result for ttl_seconds, keyed on (name, args, kwargs, today's date).
+    The session kwarg is ignored for the key. Set FETCH_CACHE=0 to bypass, or pass
+    refresh=True to skip the lookup for one call (the fresh result is still stored).
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            refresh = kwargs.pop("refresh", False)
+            if not FETCH_CACHE_ENABLED:
+                return func(*args, **kwargs)
+            key_kwargs = sorted((k, v) for k, v in kwargs.items() if k != "session")
+            key = repr((func.__name__, args, key_kwargs, now_local().date().isoformat()))
+            now = time.time()
+
+            with _fetch_cache_lock:
+                hit = None if refresh else _fetch_cache_mem.get(key)
+            if hit and hit[0] > now:
+                # callers mutate the event/hourly dicts, so hand out a copy
+                return copy.deepcopy(hit[1])
+
+            path = os.path.join(FETCH_CACHE_DIR, func.__name__ + "-" + hashlib.sha1(key.encode("utf-8")).hexdigest() + ".pkl")
+            hit = None if refresh else _fetch_cache_read(path)
+            if hit and hit[0] > now:
+                _fetch_cache_store(key, hit, now)
+                return copy.deepcopy(hit[1])
+
+            value = func(*args, **kwargs)
+            if not _fetch_result_is_empty(value):
+                # the caller gets value itself, so the cache keeps its own copy
+                entry = (now + ttl_seconds, copy.deepcopy(value))
+                _fetch_cache_store(key, entry, now)
+                _fetch_cache_write(path, entry)
+            return value
+        return wrapper
+    return decorator
+
+
 # --------------------------------------------------------------------
 # Lightweight apply_event_mapping shim (SIMPLIFIED)
 # --------------------------------------------------------------------
@@ -259,8 +653,102 @@ def date_string_for_offset(day_index=0):
 
 
 # --- REMOVED: _safe_rgb_from_mapping_entry as it is now redundant ---
-def apply_event_mapping(summary: str):
-    original = (summary or "").strip()
+def apply_event_mapping(summary: str, defer_ai=False):
+    """
+    Map a summary to display/tag/icon info. The mapping itself is memoized per summary in
+    mappings.apply_event_mapping (cleared by reload_event_mappings); the birthday age and
+    AI fallback are worked out here on every call, on a fresh dict.
+
+    defer_ai=True skips the inline OpenAI lookup and leaves the query in out["_ai_query"],
+    so a fetcher can resolve all its unknown summaries in one batch (see _defer_ai_icon).
+    """
+    out = _map_summary((summary or "").strip())
+    ai_query = out.pop("_ai_query", None)
+    if ai_query:
+        if defer_ai:
+            out["_ai_query"] = ai_query
+        else:
+            ai_icon = get_ai_suggested_icon(ai_query)
+            if ai_icon:
+                out["icon"] = ai_icon
+    return out
+
+
+def _defer_ai_icon(pending, mapped, ev):
+    """
+    Remember ev (an event dict, or the mapped dict an EventTable row points at) for the
+    batched AI icon lookup if its mapping had no local icon.
+    """
+    ai_query = mapped.get("_ai_query")
+    if ai_query:
+        pending.setdefault(ai_query, []).append(ev)
+
+
+class EventTable:
+    """
+    Events stored column-wise while fetching: the date/time per event plus a reference to the
+    (shared, per-summary) mapped dict, instead of one 13-key dict per event and day.
+    to_dicts() builds the dicts the renderer expects, once, after sorting.
+    """
+    __slots__ = ("dates", "times", "mapped", "original_names")
+
+    def __init__(self):
+        self.dates = []
+        self.times = []
+        self.mapped = []
+        self.original_names = []
+
+    def __len__(self):
+        return len(self.dates)
+
+    def append(self, date_str, time_str, mapped, original_name):
+        self.dates.append(date_str)
+        self.times.append(time_str)
+        self.mapped.append(mapped)
+        self.original_names.append(original_name)
+
+    def sort(self):
+        """Sort by (date, time) with one permutation applied to every column."""
+        dates, times = self.dates, self.times
+        order = sorted(range(len(dates)), key=lambda i: (dates[i], times[i]))
+        for col in self.__slots__:
+            values = getattr(self, col)
+            setattr(self, col, [values[i] for i in order])
+
+    def to_dicts(self):
+        out = []
+        for date_str, time_str, mapped, original_name in zip(self.dates, self.times, self.mapped, self.original_names):
+            out.append({
+                "date": date_str,
+                "name": mapped.get("display_text") or "",
+                "display_text": mapped.get("display_text"),
+                "tag_text": mapped.get("tag_text"),
+                "tag_color_name": mapped.get("tag_color_name"),
+                "tag_color_rgb": mapped.get("tag_color_rgb"),
+                "time": time_str,
+                "icon": mapped.get("icon"),
+                "icon_size": mapped.get("icon_size"),
+                "icon_color_name": mapped.get("icon_color_name"),
+                "icon_color_rgb": mapped.get("icon_color_rgb"),
+                "icon_mode": mapped.get("mode"),
+                "original_name": original_name,
+            })
+        return out
+
+
+def _resolve_ai_icons(pending):
+    """Fill in icons for events collected by _defer_ai_icon, with one OpenAI call for all misses."""
+    if not pending:
+        return
+    icons = get_ai_suggested_icons(list(pending))
+    for ai_query, evs in pending.items():
+        icon = icons.get(ai_query)
+        if icon:
+            for ev in evs:
+                ev["icon"] = icon
+
+
+def _map_summary(original: str):
 
     # --- Birthday special-case ---
     birthday_display = _format_birthday_display(original)
@@ -305,9 +793,8 @@ def apply_event_mapping(summary: str):
         # Use display_text if mapping stripped it, otherwise use original summary
         ai_query = out.get("display_text") or original
         if ai_query and len(ai_query.strip()) > 0:
-            ai_icon = get_ai_suggested_icon(ai_query)
-            if ai_icon:
-                out["icon"] = ai_icon
+            # Looked up by apply_event_mapping (inline or batched)
+            out["_ai_query"] = ai_query
         else:
             # This handles your "Middag:" case where text might be intentionally empty
             print(f"[AI Icon] Skipped: Mapping for '{original}' resulted in empty text.")
@@ -321,15 +808,16 @@ def apply_event_mapping(summary: str):
 # --------------------------------------------------------------------
 # Tommekalender integration
 # --------------------------------------------------------------------
+@ttl_cached(7 * 24 * 3600)  # fraction names hardly ever change
 def fetch_fraction_names(session=None):
-    session = session or requests.Session()
+    session = session or _SESSION
     url = f"{MOVAR_BASE}/Fraksjoner"
     headers = {"Kommunenr": KOMMUNENR, "Accept": "application/json", "User-Agent": "InkyFrameCalendar/1.0"}
     params = {"apitoken": MOVAR_API_TOKEN} if MOVAR_API_TOKEN else {}
     try:
         r = session.get(url, headers=headers, params=params, timeout=10, verify=True)
         if r.status_code == 200:
-            data = r.json()
+            data = _loads(r.content)
             return {int(item.get("id", -1)): item.get("navn", "") for item in data}
         else:
             if r.status_code == 401:
@@ -343,8 +831,9 @@ def fetch_fraction_names(session=None):
         return {}
 
 
+@ttl_cached(6 * 3600)
 def fetch_tommekalender_events(fraction_names, days=DEFAULT_DAYS, session=None, gatenavn=None, husnr=None):
-    session = session or requests.Session()
+    session = session or _SESSION
     gatenavn = gatenavn or MOVAR_GATENAVN
     husnr = husnr or MOVAR_HUSNR
     url = f"{MOVAR_BASE}/Tommekalender"
@@ -353,6 +842,8 @@ def fetch_tommekalender_events(fraction_names, days=DEFAULT_DAYS, session=None,
     if MOVAR_API_TOKEN:
         params["apitoken"] = MOVAR_API_TOKEN
     events = []
+    seen = set()  # (date, name) already added; O(1) instead of scanning events
+    pending_ai = {}  # ai_query -> events waiting for a batched AI icon
     try:
         r = session.get(url, headers=headers, params=params, timeout=10, verify=True)
         if r.status_code != 200:
@@ -361,7 +852,7 @@ def fetch_tommekalender_events(fraction_names, days=DEFAULT_DAYS, session=None,
                 try_headers["apitoken"] = MOVAR_API_TOKEN
                 r2 = session.get(url, headers=try_headers, params={"gatenavn": gatenavn, "husnr": husnr}, timeout=10, verify=True)
             return events
-        data = r.json()
+        data = _loads(r.content)
         allowed = {date_string_for_offset(i) for i in range(days)}
         for item in data:
             try:
@@ -375,7 +866,7 @@ def fetch_tommekalender_events(fraction_names, days=DEFAULT_DAYS, session=None,
                 date_part = d_iso[:10]
                 if date_part in allowed:
                     raw_name = "Movar: " + fraction_names.get(fid, "Ukjent")
-                    mapped = apply_event_mapping(raw_name)
+                    mapped = apply_event_mapping(raw_name, defer_ai=True)
                     if mapped.get("filtered_out"):
                         continue
                     ev = {
@@ -393,10 +884,14 @@ def fetch_tommekalender_events(fraction_names, days=DEFAULT_DAYS, session=None,
                         "icon_mode": mapped.get("mode"),
                         "original_name": raw_name,
                     }
-                    if not any(e['date'] == ev['date'] and e['name'] == ev['name'] for e in events):
+                    key = (ev['date'], ev['name'])
+                    if key not in seen:
+                        seen.add(key)
                         events.append(ev)
+                        _defer_ai_icon(pending_ai, mapped, ev)
     except Exception as ex:
         print("[fetch_tommekalender_events] exception:", ex)
+    _resolve_ai_icons(pending_ai)
     return events
 
 
@@ -417,8 +912,23 @@ def _ensure_aware(dt):
     return dt.astimezone(timezone.utc)
 
 
+def _parse_iso_date(s):
+    """'YYYY-MM-DD' -> date by slicing; strptime only for anything unexpected."""
+    if len(s) == 10 and s[4] == "-" and s[7] == "-":
+        return date(int(s[0:4]), int(s[5:7]), int(s[8:10]))
+    return datetime.strptime(s, "%Y-%m-%d").date()
+
+
+def _parse_iso_local(s):
+    """'YYYY-MM-DDTHH:MM:SS' -> naive datetime by slicing; strptime only for anything unexpected."""
+    if len(s) == 19 and s[10] == "T" and s[13] == ":" and s[16] == ":":
+        return datetime(int(s[0:4]), int(s[5:7]), int(s[8:10]), int(s[11:13]), int(s[14:16]), int(s[17:19]))
+    return datetime.strptime(s, "%Y-%m-%dT%H:%M:%S")
+
+
+@ttl_cached(30 * 60)
 def fetch_google_calendar_events(days=DEFAULT_DAYS, session=None):
-    session = session or requests.Session()
+    session = session or _SESSION
     today_local = now_local().date()
 
     if TZ:
@@ -434,40 +944,57 @@ def fetch_google_calendar_events(days=DEFAULT_DAYS, session=None):
 
     timeMin = iso_z(start_utc)
     timeMax = iso_z(end_utc)
-    url = (
-        f"https://www.googleapis.com/calendar/v3/calendars/{CALENDAR_ID}/events"
-        f"?timeMin={timeMin}&timeMax={timeMax}&singleEvents=true&fields=items(summary,start,end)&orderBy=startTime&key={API_KEY_GOOGLE}"
-    )
+    url = f"https://www.googleapis.com/calendar/v3/calendars/{quote(CALENDAR_ID or '', safe='')}/events"
+    params = {
+        "timeMin": timeMin,
+        "timeMax": timeMax,
+        "singleEvents": "true",
+        "orderBy": "startTime",
+        "maxResults": min(days * 10, 250),
+        "fields": "items(summary,start(date,dateTime),end(date,dateTime))",
+        "key": API_KEY_GOOGLE,
+    }
 
-    events = []
+    table = EventTable()
+    seen = set()  # (date, name, time) already added; O(1) instead of scanning events
+    pending_ai = {}  # ai_query -> mapped dicts waiting for a batched AI icon (shared by their events)
+    # Local dates inside the requested window; the start is invariant for the whole fetch
+    query_start_date = window_start = start_local_dt.date()
+    window_days = [(d, d.strftime("%Y-%m-%d")) for d in (window_start + timedelta(days=i) for i in range(days))]
+
+    def days_in_window(first, last):
+        """(date, 'YYYY-MM-DD') pairs for first..last clipped to the window, without walking day by day."""
+        lo = max((first - window_start).days, 0)
+        hi = min((last - window_start).days + 1, days)
+        return window_days[lo:hi] if lo < hi else ()
+    r = None
     try:
-        r = session.get(url, timeout=10)
+        r = session.get(url, params=params, headers={"Accept-Encoding": "gzip"}, timeout=10, stream=True)
         if r.status_code == 200:
-            data = r.json()
-            items = data.get("items", [])
+            if int(r.headers.get("Content-Length") or 0) > MAX_JSON_BYTES:
+                print("[fetch_google_calendar_events] response too large:", r.headers.get("Content-Length"))
+                return []
+            if ijson is not None:
+                # one event dict at a time straight off the socket
+                r.raw.decode_content = True
+                items = ijson.items(r.raw, "items.item")
+            else:
+                items = _loads(r.content).get("items", [])
             for it in items:
-                summary = (it.get("summary") or "").strip()
-                if not summary:
+                # Cheap precheck before any mapping work: need a summary and a start
+                if not (summary := (it.get("summary") or "").strip()) or not (start := it.get("start")):
                     continue
-                # Removed redundant pre-check logic (was lines 339-346)
-                
-                start = it.get("start", {})
-                end = it.get("end", {})
+                end = it.get("end") or start
                 if "date" in start:  # heldags-event
                     sdate = start["date"]
                     edate = end.get("date", sdate)
                     try:
-                        sdt = datetime.strptime(sdate, "%Y-%m-%d").date()
-                        edt = datetime.strptime(edate, "%Y-%m-%d").date()
+                        sdt = _parse_iso_date(sdate)
+                        edt = _parse_iso_date(edate)
                     except Exception:
                         sdt = None
                         edt = None
 
-                    try:
-                        query_start_date = start_local_dt.date()
-                    except Exception:
-                        query_start_date = now_local().date()
-
                     if sdt is None or edt is None:
                         date_str = sdate
                         try:
@@ -475,53 +1002,27 @@ def fetch_google_calendar_events(days=DEFAULT_DAYS, session=None):
                                 continue
                         except Exception:
                             pass
-                        mapped = apply_event_mapping(summary)
+                        mapped = apply_event_mapping(summary, defer_ai=True)
                         if mapped.get("filtered_out"):
                             continue
-                        ev = {
-                            "date": date_str,
-                            "name": mapped.get("display_text") or "",
-                            "display_text": mapped.get("display_text"),
-                            "tag_text": mapped.get("tag_text"),
-                            "tag_color_name": mapped.get("tag_color_name"),
-                            "tag_color_rgb": mapped.get("tag_color_rgb"),
-                            "time": "",
-                            "icon": mapped.get("icon"),
-                            "icon_size": mapped.get("icon_size"),
-                            "icon_color_name": mapped.get("icon_color_name"),
-                            "icon_color_rgb": mapped.get("icon_color_rgb"),
-                            "icon_mode": mapped.get("mode"),
-                            "original_name": summary,
-                        }
-                        if not any(e['date'] == ev['date'] and e['name'] == ev['name'] and e.get('time','') == ev['time'] for e in events):
-                            events.append(ev)
+                        key = (date_str, mapped.get("display_text") or "", "")
+                        if key not in seen:
+                            seen.add(key)
+                            table.append(date_str, "", mapped, summary)
+                            _defer_ai_icon(pending_ai, mapped, mapped)
                     else:
+                        # Same summary for every day of the event: map it once
+                        mapped = apply_event_mapping(summary, defer_ai=True)
+                        if mapped.get("filtered_out"):
+                            continue
                         last_day = edt - timedelta(days=1)
-                        day = max(sdt, query_start_date)
-                        while day <= last_day:
-                            date_str = day.strftime("%Y-%m-%d")
-                            mapped = apply_event_mapping(summary)
-                            if mapped.get("filtered_out"):
-                                day += timedelta(days=1)
-                                continue
-                            ev = {
-                                "date": date_str,
-                                "name": mapped.get("display_text") or "",
-                                "display_text": mapped.get("display_text"),
-                                "tag_text": mapped.get("tag_text"),
-                                "tag_color_name": mapped.get("tag_color_name"),
-                                "tag_color_rgb": mapped.get("tag_color_rgb"),
-                                "time": "",
-                                "icon": mapped.get("icon"),
-                                "icon_size": mapped.get("icon_size"),
-                                "icon_color_name": mapped.get("icon_color_name"),
-                                "icon_color_rgb": mapped.get("icon_color_rgb"),
-                                "icon_mode": mapped.get("mode"),
-                                "original_name": summary,
-                            }
-                            if not any(e['date'] == ev['date'] and e['name'] == ev['name'] and e.get('time','') == ev['time'] for e in events):
-                                events.append(ev)
-                            day += timedelta(days=1)
+                        name = mapped.get("display_text") or ""
+                        for day, date_str in days_in_window(max(sdt, query_start_date), last_day):
+                            key = (date_str, name, "")
+                            if key not in seen:
+                                seen.add(key)
+                                table.append(date_str, "", mapped, summary)
+                                _defer_ai_icon(pending_ai, mapped, mapped)
                 elif "dateTime" in start:
                     dt_start_raw = start.get("dateTime")
                     dt_end_raw = end.get("dateTime") or dt_start_raw
@@ -529,33 +1030,21 @@ def fetch_google_calendar_events(days=DEFAULT_DAYS, session=None):
                     dt_core_start = dt_start_raw[:19]
                     dt_core_end = dt_end_raw[:19]
                     try:
-                        dt_start = datetime.strptime(dt_core_start, "%Y-%m-%dT%H:%M:%S")
-                        dt_end = datetime.strptime(dt_core_end, "%Y-%m-%dT%H:%M:%S")
+                        dt_start = _parse_iso_local(dt_core_start)
+                        dt_end = _parse_iso_local(dt_core_end)
                     except Exception:
                         try:
                             dt = datetime.strptime(dt_core_start, "%Y-%m-%dT%H:%M:%S")
                             date_str = dt.strftime("%Y-%m-%d")
                             time_str = dt.strftime("%H:%M")
-                            mapped = apply_event_mapping(summary)
+                            mapped = apply_event_mapping(summary, defer_ai=True)
                             if mapped.get("filtered_out"):
                                 continue
-                            ev = {
-                                "date": date_str,
-                                "name": mapped.get("display_text") or "",
-                                "display_text": mapped.get("display_text"),
-                                "tag_text": mapped.get("tag_text"),
-                                "tag_color_name": mapped.get("tag_color_name"),
-                                "tag_color_rgb": mapped.get("tag_color_rgb"),
-                                "time": time_str,
-                                "icon": mapped.get("icon"),
-                                "icon_size": mapped.get("icon_size"),
-                                "icon_color_name": mapped.get("icon_color_name"),
-                                "icon_color_rgb": mapped.get("icon_color_rgb"),
-                                "icon_mode": mapped.get("mode"),
-                                "original_name": summary,
-                            }
-                            if not any(e['date'] == ev['date'] and e['name'] == ev['name'] and e.get('time','') == ev['time'] for e in events):
-                                events.append(ev)
+                            key = (date_str, mapped.get("display_text") or "", time_str)
+                            if key not in seen:
+                                seen.add(key)
+                                table.append(date_str, time_str, mapped, summary)
+                                _defer_ai_icon(pending_ai, mapped, mapped)
                         except Exception:
                             pass
                         continue
@@ -565,43 +1054,28 @@ def fetch_google_calendar_events(days=DEFAULT_DAYS, session=None):
                     include_end = (dt_end.time() != datetime.min.time())
                     last_day = edt if include_end else (edt - timedelta(days=1))
 
-                    try:
-                        query_start_date = start_local_dt.date()
-                    except Exception:
-                        query_start_date = now_local().date()
+                    mapped = apply_event_mapping(summary, defer_ai=True)
+                    if mapped.get("filtered_out"):
+                        continue
 
-                    day = max(sdt, query_start_date)
-                    while day <= last_day:
-                        date_str = day.strftime("%Y-%m-%d")
-                        mapped = apply_event_mapping(summary)
-                        if mapped.get("filtered_out"):
-                            day += timedelta(days=1)
-                            continue
+                    name = mapped.get("display_text") or ""
+                    start_time_str = dt_start.strftime("%H:%M")
+                    for day, date_str in days_in_window(max(sdt, query_start_date), last_day):
+                        time_str = start_time_str if day == sdt else ""
 
-                        time_str = dt_start.strftime("%H:%M") if day == sdt else ""
-
-                        ev = {
-                            "date": date_str,
-                            "name": mapped.get("display_text") or "",
-                            "display_text": mapped.get("display_text"),
-                            "tag_text": mapped.get("tag_text"),
-                            "tag_color_name": mapped.get("tag_color_name"),
-                            "tag_color_rgb": mapped.get("tag_color_rgb"),
-                            "time": time_str,
-                            "icon": mapped.get("icon"),
-                            "icon_size": mapped.get("icon_size"),
-                            "icon_color_name": mapped.get("icon_color_name"),
-                            "icon_color_rgb": mapped.get("icon_color_rgb"),
-                            "icon_mode": mapped.get("mode"),
-                            "original_name": summary,
-                        }
-                        if not any(e['date'] == ev['date'] and e['name'] == ev['name'] and e.get('time','') == ev['time'] for e in events):
-                            events.append(ev)
-                        day += timedelta(days=1)
+                        key = (date_str, name, time_str)
+                        if key not in seen:
+                            seen.add(key)
+                            table.append(date_str, time_str, mapped, summary)
+                            _defer_ai_icon(pending_ai, mapped, mapped)
     except Exception as ex:
         print("[fetch_google_calendar_events] exception:", ex)
-    events.sort(key=lambda e: (e['date'], e.get('time', '')))
-    return events
+    finally:
+        if r is not None:
+            r.close()
+    _resolve_ai_icons(pending_ai)
+    table.sort()
+    return table.to_dicts()
 
 
 # --------------------------------------------------------------------
@@ -616,6 +1090,7 @@ except Exception:
         pass
 
 
+@ttl_cached(15 * 60)
 def fetch_weather_from_provider(lat=LAT, lon=LON, days=DEFAULT_DAYS):
     try:
         forecast = get_forecast_json(lat=lat, lon=lon, days=days, user_agent="InkyFrameCalendar/1.0 (contact: youremail@example.com)", keep_debug_hourly=True)
@@ -655,22 +1130,31 @@ def _color_from_mapping_entry(entry):
                 pass
     for k in ("color", "tag_color_name", "icon_color_name", "color_name"):
         if entry.get(k):
-            try:
-                rgb = ImageColor.getrgb(str(entry.get(k)))
-                return (int(rgb[0]), int(rgb[1]), int(rgb[2]))
-            except Exception:
-                pass
+            rgb = _getrgb_cached(str(entry.get(k)))
+            if rgb is not None:
+                return rgb
     for k, v in entry.items():
         try:
             if str(k).lower().endswith("color") and v:
-                rgb = ImageColor.getrgb(str(v))
-                return (int(rgb[0]), int(rgb[1]), int(rgb[2]))
+                rgb = _getrgb_cached(str(v))
+                if rgb is not None:
+                    return rgb
         except Exception:
             pass
     return None
 
 
 
+# Capitalized words, Norwegian letters included
+_CAPS_RE = re.compile(r"\b[A-ZÆØÅ][a-zæøåA-ZÆØÅ'\-]+\b")
+_SPLIT_RE = re.compile(r"[,;/\-:]+|\s+")
+# Name tokens for the tag fallback in enrich_events_with_tags
+_TOK_SPLIT_RE = re.compile(r"[,\s\-\:]+")
+
+def _s(x):
+    """x as a str without the str() call when it already is one (JSON fields mostly are); None -> ""."""
+    return x if type(x) is str else (str(x) if x is not None else "")
+
 def _split_tag_text_into_tokens(raw):
     """
     Heuristic splitting: commas first; else capitalized words.
@@ -678,22 +1162,22 @@ def _split_tag_text_into_tokens(raw):
     """
     if not raw:
         return []
-    s = str(raw).strip()
+    s = _s(raw).strip()
     # If comma-separated, use those
     if "," in s:
         parts = [p.strip() for p in s.split(",") if p.strip()]
         if parts:
             return parts
     # Collapse whitespace and return single token if short
-    s_clean = re.sub(r"\s+", " ", s).strip()
+    s_clean = " ".join(s.split())
     if len(s_clean) <= 30 and " " not in s_clean:
         return [s_clean]
     # Try to capture capitalized words (Norwegian chars included)
-    caps = re.findall(r"\\b[A-ZÆØÅ][a-zæøåA-ZÆØÅ\\-']+\\b", s_clean)
+    caps = _CAPS_RE.findall(s_clean)
     if caps:
         return caps
     # Fallback: split on spaces and punctuation
-    parts = [p.strip() for p in re.split(r"[,;/\\-\\:]+|\\s+", s_clean) if p.strip()]
+    parts = [p.strip() for p in _SPLIT_RE.split(s_clean) if p.strip()]
     return parts
 
 def _ensure_rgb(rgb_like):
@@ -713,6 +1197,46 @@ def _ensure_rgb(rgb_like):
         return None
     return None
 
+
+def _normalize_tag_dict(t):
+    """Return {'text', 'color_rgb'} for a tag dict (color_rgb or color_name), or None if t isn't a dict."""
+    if not isinstance(t, dict):
+        return None
+    te = {"text": _s(t.get("text")).strip()}
+    try:
+        c = t.get("color_rgb")
+        if c is not None:
+            if type(c) is tuple and len(c) == 3 and type(c[0]) is int and type(c[1]) is int and type(c[2]) is int:
+                te["color_rgb"] = c
+            else:
+                te["color_rgb"] = _ensure_rgb(c)
+        elif t.get("color_name"):
+            rgb = _getrgb_cached(_s(t.get("color_name")))
+            if rgb is not None:
+                te["color_rgb"] = rgb
+    except Exception:
+        pass
+    return te
+
+def _first(ev, *keys, default=None):
+    """First truthy ev[k] for k in keys (same as ev.get(a) or ev.get(b) or ... or default)."""
+    get = ev.get
+    for k in keys:
+        v = get(k)
+        if v:
+            return v
+    return default
+
+# Shape of the fallback event built by normalize_event when the normal path fails
+_EMPTY_EVENT_TEMPLATE = {
+    'date': None, 'time': "", 'name': "", 'display_text': "", 'original_name': "",
+    'tag_text': "", 'tag_color_name': None, 'tag_color_rgb': None,
+    'icon': None, 'icon_size': None, 'icon_color_name': None, 'icon_color_rgb': None,
+    'icon_mode': None, 'calendar': None, 'all_day': False, 'tags': None,
+}
+# copied as-is from the raw event in the fallback
+_EVENT_PASSTHROUGH_FIELDS = ('date', 'tag_color_name', 'icon', 'icon_size', 'icon_color_name', 'icon_mode', 'calendar')
+
 def normalize_event(ev):
     """
     Normalize incoming event dict from any source into canonical shape.
@@ -720,45 +1244,45 @@ def normalize_event(ev):
     """
     out = {}
     try:
-        out['date'] = ev.get('date') or ev.get('dt') or None
-        out['time'] = ev.get('time') or ev.get('start_time') or ev.get('time_str') or ""
-        out['calendar'] = ev.get('calendar') or ev.get('source') or None
+        out['date'] = _first(ev, 'date', 'dt')
+        out['time'] = _first(ev, 'time', 'start_time', 'time_str', default="")
+        out['calendar'] = _first(ev, 'calendar', 'source')
         out['all_day'] = bool(ev.get('all_day')) or (out['time'] == "")
 
-        original = ev.get('original_name') or ev.get('name') or ev.get('summary') or ""
+        original = _first(ev, 'original_name', 'name', 'summary', default="")
         display_text = ev.get('display_text') if ev.get('display_text') is not None else ev.get('name')
         if display_text is None:
             display_text = original
 
         out['original_name'] = original
-        out['display_text'] = str(display_text).strip() if display_text is not None else ""
+        out['display_text'] = _s(display_text).strip()
         out['name'] = out['display_text']
 
-        raw_tag = ev.get('tag_text') or ev.get('tag') or ev.get('tags_text') or ""
+        raw_tag = _first(ev, 'tag_text', 'tag', 'tags_text', default="")
         if raw_tag:
-            t = re.sub(r"\s+", " ", str(raw_tag).strip())
+            t = " ".join(_s(raw_tag).split())
             # FIX: Removed .lower() to preserve capitalization
             t_clean = t
             out['tag_text'] = t_clean
         else:
             out['tag_text'] = ""
 
-        out['tag_color_name'] = ev.get('tag_color_name') or ev.get('color') or ev.get('tag_color') or None
-        rgb = ev.get('tag_color_rgb') or ev.get('color_rgb') or ev.get('icon_color_rgb')
+        out['tag_color_name'] = _first(ev, 'tag_color_name', 'color', 'tag_color')
+        rgb = _first(ev, 'tag_color_rgb', 'color_rgb', 'icon_color_rgb')
         out['tag_color_rgb'] = _ensure_rgb(rgb)
 
         out['icon'] = ev.get('icon')
-        out['icon_size'] = ev.get('icon_size') or ev.get('size_px') or None
-        out['icon_color_name'] = ev.get('icon_color_name') or ev.get('icon_color') or None
-        out['icon_color_rgb'] = _ensure_rgb(ev.get('icon_color_rgb') or ev.get('icon_color'))
+        out['icon_size'] = _first(ev, 'icon_size', 'size_px')
+        out['icon_color_name'] = _first(ev, 'icon_color_name', 'icon_color')
+        out['icon_color_rgb'] = _ensure_rgb(_first(ev, 'icon_color_rgb', 'icon_color'))
 
-        out['icon_mode'] = ev.get('icon_mode') or ev.get('mode') or None
+        out['icon_mode'] = _first(ev, 'icon_mode', 'mode')
 
         tags = []
-        for t in ev.get('tags') or ev.get('structured_tags') or []:
+        for t in _first(ev, 'tags', 'structured_tags', default=()):
             try:
                 if isinstance(t, dict) and t.get('text'):
-                    entry = {'text': str(t.get('text')).strip()}
+                    entry = {'text': _s(t.get('text')).strip()}
                     if t.get('color_rgb'):
                         entry['color_rgb'] = _ensure_rgb(t.get('color_rgb'))
                     elif t.get('color_name'):
@@ -771,27 +1295,182 @@ def normalize_event(ev):
         out['_raw'] = ev
 
     except Exception:
-        out = {
-            'date': ev.get('date'),
-            'time': ev.get('time') or "",
-            'name': ev.get('name') or ev.get('original_name') or "",
-            'display_text': ev.get('display_text') or ev.get('name') or "",
-            'original_name': ev.get('original_name') or ev.get('name') or "",
-            'tag_text': ev.get('tag_text') or "",
-            'tag_color_name': ev.get('tag_color_name'),
-            'tag_color_rgb': None,
-            'icon': ev.get('icon'),
-            'icon_size': ev.get('icon_size'),
-            'icon_color_name': ev.get('icon_color_name'),
-            'icon_color_rgb': None,
-            'icon_mode': ev.get('icon_mode'),
-            'calendar': ev.get('calendar'),
-            'all_day': bool(ev.get('all_day')),
-            'tags': ev.get('tags') or []
-        }
+        get = ev.get
+        out = _EMPTY_EVENT_TEMPLATE.copy()
+        for k in _EVENT_PASSTHROUGH_FIELDS:
+            out[k] = get(k)
+        name = get('name')
+        out['time'] = get('time') or ""
+        out['name'] = name or get('original_name') or ""
+        out['display_text'] = get('display_text') or name or ""
+        out['original_name'] = get('original_name') or name or ""
+        out['tag_text'] = get('tag_text') or ""
+        out['all_day'] = bool(get('all_day'))
+        out['tags'] = get('tags') or []
         out['_raw'] = ev
     return out
 
+# Variant helpers are pure and see the same keywords/tokens over and over, so they are
+# memoized and return tuples (immutable, safe to share between callers).
+@functools.lru_cache(maxsize=4096)
+def _variants_for_key(k):
+    """Lookup keys to register for mapping keyword k (pass a str)."""
+    k = k.strip()
+    if not k:
+        return ()
+    # normalize internal whitespace
+    k_norm = " ".join(k.split())
+    variants = set()
+    variants.add(k_norm)
+    variants.add(k_norm.lower())
+    variants.add(k_norm.rstrip(":"))
+    variants.add(k_norm.rstrip(":").lower())
+    variants.add(k_norm.capitalize())
+    variants.add(k_norm.title())
+    # also add versions without diacritics? (optional)
+    return tuple(v for v in variants if v)
+
+
+@functools.lru_cache(maxsize=4096)
+def _variants_for_token(p):
+    """Return a tuple of normalized variants to try for token p."""
+    if p is None:
+        return ()
+    s = _s(p).strip()
+    # collapse whitespace
+    s = " ".join(s.split())
+    variants = []
+    # original trimmed
+    variants.append(s)
+    # without trailing colons
+    variants.append(s.rstrip(":"))
+    # lower variants
+    variants.append(s.lower())
+    variants.append(s.rstrip(":").lower())
+    # also capitalized and title (helps for lookup that might have Title case)
+    variants.append(s.capitalize())
+    variants.append(s.title())
+    # dedupe preserving order
+    return tuple(v for v in dict.fromkeys(variants) if v)
+
+
+class _KeyMatcher:
+    """
+    Finds the first lookup key (in dict order) that is a substring of a token, or that
+    contains the token. Built once per lookup so each token is scanned once instead of
+    being compared against every key:
+      - key in token: Aho-Corasick (pyahocorasick if installed, else a small trie)
+      - token in key: one str.find pass over all keys joined with NUL
+    """
+    __slots__ = ("keys", "_auto", "_trie", "_joined", "_starts")
+
+    def __init__(self, keys):
+        self.keys = [k for k in keys if isinstance(k, str) and k]
+        self._auto = None
+        self._trie = None
+        if ahocorasick is not None:
+            self._auto = ahocorasick.Automaton()
+            for i, k in enumerate(self.keys):
+                self._auto.add_word(k, i)
+            self._auto.make_automaton()
+        else:
+            self._trie = {}
+            for i, k in enumerate(self.keys):
+                node = self._trie
+                for ch in k:
+                    node = node.setdefault(ch, {})
+                node.setdefault(None, i)
+        self._joined = "\0".join(self.keys)
+        self._starts = []
+        pos = 0
+        for k in self.keys:
+            self._starts.append(pos)
+            pos += len(k) + 1
+
+    def _first_key_in(self, p):
+        best = None
+        if self._auto is not None:
+            for _end, i in self._auto.iter(p):
+                if best is None or i < best:
+                    best = i
+            return best
+        trie = self._trie
+        for start in range(len(p)):
+            node = trie
+            for ch in p[start:]:
+                node = node.get(ch)
+                if node is None:
+                    break
+                i = node.get(None)
+                if i is not None and (best is None or i < best):
+                    best = i
+        return best
+
+    def _first_key_containing(self, p):
+        if "\0" in p:
+            return None
+        joined, starts = self._joined, self._starts
+        pos = joined.find(p)
+        if pos == -1:
+            return None
+        # matches come in key order, so the first hit is the earliest key
+        return bisect.bisect_right(starts, pos) - 1
+
+    def find(self, p):
+        """Return the matching key or None."""
+        if not p or not self.keys:
+            return None
+        a = self._first_key_in(p)
+        b = self._first_key_containing(p)
+        if a is None and b is None:
+            return None
+        if a is None or (b is not None and b < a):
+            return self.keys[b]
+        return self.keys[a]
+
+
+def _enrich_tokens_py(tokens, lookup):
+    """
+    [(token, lookup entry or None, variants)] for tokens of length 2..30.
+    Pure-Python twin of _tagfast.enrich_tokens.
+    """
+    out = []
+    lookup_get = lookup.get
+    for t in tokens:
+        if len(t) > 30 or len(t) < 2:
+            continue
+        variants = _variants_for_token(t)
+        entry = None
+        for candidate in variants:
+            entry = lookup_get(candidate) or lookup_get(candidate.lower())
+            if entry:
+                break
+        out.append((t, entry or None, variants))
+    return out
+
+
+_enrich_tokens = None
+
+
+def _load_tagfast():
+    """Return the token matcher: Cython _tagfast.enrich_tokens if it builds, else _enrich_tokens_py."""
+    global _enrich_tokens
+    if _enrich_tokens is None:
+        _enrich_tokens = _enrich_tokens_py
+        try:
+            import pyximport  # Cython, optional: compiles _tagfast.pyx on first import
+            pyximport.install(language_level=3)
+            from _tagfast import enrich_tokens as _c_enrich_tokens
+            _enrich_tokens = _c_enrich_tokens
+        except Exception:
+            pass
+    return _enrich_tokens
+
+
+# id(EVENT_MAPPINGS object) -> (object, lookup dict, _KeyMatcher or None)
+_LOOKUP_CACHE = {}
+
+
 # --- Retaining complex _build_lookup_from_EVENT_MAPPINGS as it is a dependency for enrich_events_with_tags ---
 def _build_lookup_from_EVENT_MAPPINGS(event_mappings_obj):
     """
@@ -800,44 +1479,27 @@ def _build_lookup_from_EVENT_MAPPINGS(event_mappings_obj):
     Make the lookup tolerant: register several normalized variants for each keyword
     so matching works regardless of case and trailing ':' punctuation produced by
     different calendar sources.
+
+    The result is cached per mappings object (mappings.reload_event_mappings rebinds
+    EVENT_MAPPINGS to a new list); treat the returned dict as read-only.
     """
+    cached = _LOOKUP_CACHE.get(id(event_mappings_obj))
+    if cached is not None and cached[0] is event_mappings_obj:
+        return cached[1]
     lookup = {}
     if not event_mappings_obj:
         return lookup
     try:
-        def _variants_for_key(k):
-            k = str(k).strip()
-            if not k:
-                return []
-            # normalize internal whitespace
-            k_norm = re.sub(r"\s+", " ", k).strip()
-            variants = set()
-            variants.add(k_norm)
-            variants.add(k_norm.lower())
-            variants.add(k_norm.rstrip(":"))
-            variants.add(k_norm.rstrip(":").lower())
-            variants.add(k_norm.capitalize())
-            variants.add(k_norm.title())
-            # also add versions without diacritics? (optional)
-            # dedupe
-            seen = set()
-            out = []
-            for v in variants:
-                if v and v not in seen:
-                    seen.add(v)
-                    out.append(v)
-            return out
-
         if isinstance(event_mappings_obj, dict):
             for k, v in event_mappings_obj.items():
-                for cand in _variants_for_key(k):
+                for cand in _variants_for_key(_s(k)):
                     lookup[cand] = v
                 # also register common alternative fields inside the mapping dict
                 if isinstance(v, dict):
                     for candidate_field in ("replacement", "token", "keyword", "name"):
                         val = v.get(candidate_field)
                         if val:
-                            for cand in _variants_for_key(val):
+                            for cand in _variants_for_key(_s(val)):
                                 lookup[cand] = v
         elif isinstance(event_mappings_obj, (list, tuple)):
             for v in event_mappings_obj:
@@ -847,22 +1509,48 @@ def _build_lookup_from_EVENT_MAPPINGS(event_mappings_obj):
                 for candidate_field in ("keyword", "token", "replacement", "name"):
                     val = v.get(candidate_field)
                     if val:
-                        for cand in _variants_for_key(val):
+                        for cand in _variants_for_key(_s(val)):
                             lookup[cand] = v
                 # as a fallback, if the mapping row uses plain keys, try 'keyword' spelled differently
                 # (some versions of the mapping sheet may use slightly different names)
                 for alt in ("key", "kw"):
                     val = v.get(alt)
                     if val:
-                        for cand in _variants_for_key(val):
+                        for cand in _variants_for_key(_s(val)):
                             lookup[cand] = v
     except Exception:
         # be defensive: if anything goes wrong, return what we built so far
         pass
+    # keep a reference to the object itself so its id() can't be reused while cached
+    _LOOKUP_CACHE[id(event_mappings_obj)] = (event_mappings_obj, lookup, _KeyMatcher(lookup) if lookup else None)
     return lookup
 
 
+def _lookup_and_matcher(event_mappings_obj):
+    """(lookup, _KeyMatcher or None) for a mappings object; the matcher is cached with the lookup."""
+    lookup = _build_lookup_from_EVENT_MAPPINGS(event_mappings_obj)
+    cached = _LOOKUP_CACHE.get(id(event_mappings_obj))
+    if cached is not None and cached[0] is event_mappings_obj:
+        return lookup, cached[2]
+    return lookup, (_KeyMatcher(lookup) if lookup else None)
+
+
+def clear_mapping_cache():
+    """Forget cached lookups (call after reloading or editing EVENT_MAPPINGS in place)."""
+    _LOOKUP_CACHE.clear()
+    cached = getattr(mappings_module, "_apply_event_mapping_cached", None)
+    if cached is not None:
+        cached.cache_clear()
+
+
 # --- Keeping original enrich_events_with_tags as requested ---
+# mappings.apply_event_mapping and DEBUG_TAG_MATCH are resolved on the first
+# enrich_events_with_tags call and reused after that
+_sentinel = object()
+_MAPPING_FUNC = _sentinel
+_DEBUG_TAG_MATCH = False
+
+
 def enrich_events_with_tags(events, EVENT_MAPPINGS=None, prefer_mapping_module=True):
     """
     Enrich events with ev['tags'] = [{'text':..., 'color_rgb':(r,g,b)}] where possible.
@@ -872,52 +1560,29 @@ def enrich_events_with_tags(events, EVENT_MAPPINGS=None, prefer_mapping_module=T
       - tries mapping_func with normalized variants
       - optional debug with env var DEBUG_TAG_MATCH=1 to print tried variants
     """
-    import importlib
-    import os
-    mapping_func = None
-    try:
-        m = importlib.import_module("mappings")
-        if hasattr(m, "apply_event_mapping") and callable(getattr(m, "apply_event_mapping")):
-            mapping_func = getattr(m, "apply_event_mapping")
-    except Exception:
-        mapping_func = None
+    global _MAPPING_FUNC, _DEBUG_TAG_MATCH
+    if _MAPPING_FUNC is _sentinel:
+        try:
+            import mappings as _m
+            func = getattr(_m, "apply_event_mapping", None)
+            _MAPPING_FUNC = func if callable(func) else None
+        except Exception:
+            _MAPPING_FUNC = None
+        _DEBUG_TAG_MATCH = os.environ.get("DEBUG_TAG_MATCH") == "1"
+    mapping_func = _MAPPING_FUNC
+    DEBUG = _DEBUG_TAG_MATCH
 
-    lookup = {}
+    lookup, matcher = {}, None
     if EVENT_MAPPINGS:
-        lookup = _build_lookup_from_EVENT_MAPPINGS(EVENT_MAPPINGS)
-
-    DEBUG = os.environ.get("DEBUG_TAG_MATCH") == "1"
-
-    def _variants_for_token(p):
-        """Return a list of normalized variants to try for token p."""
-        if p is None:
-            return []
-        s = str(p).strip()
-        # collapse whitespace
-        s = re.sub(r"\s+", " ", s)
-        variants = []
-        # original trimmed
-        variants.append(s)
-        # without trailing colons
-        variants.append(s.rstrip(":"))
-        # lower variants
-        variants.append(s.lower())
-        variants.append(s.rstrip(":").lower())
-        # also capitalized and title (helps for lookup that might have Title case)
-        variants.append(s.capitalize())
-        variants.append(s.title())
-        # dedupe preserving order
-        seen = set()
-        out = []
-        for v in variants:
-            if v and v not in seen:
-                seen.add(v)
-                out.append(v)
-        return out
-
-    def _find_entry_for_token(p):
-        """Try lookup and mapping_func with tolerant variants. Return mapping entry or None."""
-        variants = _variants_for_token(p)
+        lookup, matcher = _lookup_and_matcher(EVENT_MAPPINGS)
+
+    def _find_entry_and_variants(p, variants=None):
+        """
+        Try lookup and mapping_func with tolerant variants.
+        Return (mapping entry or None, variants tuple) so callers can reuse the variants.
+        """
+        if variants is None:
+            variants = _variants_for_token(p)
         if DEBUG:
             print("[TAGDEBUG] token:", repr(p), "variants:", variants)
         # try lookup dictionary first
@@ -926,7 +1591,7 @@ def enrich_events_with_tags(events, EVENT_MAPPINGS=None, prefer_mapping_module=T
             if entry:
                 if DEBUG:
                     print("[TAGDEBUG] lookup hit:", v)
-                return entry
+                return entry, variants
         # try mapping_func on variants
         if mapping_func:
             for v in variants:
@@ -935,47 +1600,46 @@ def enrich_events_with_tags(events, EVENT_MAPPINGS=None, prefer_mapping_module=T
                     if isinstance(info, dict) and info:
                         if DEBUG:
                             print("[TAGDEBUG] mapping_func hit:", v, "->", info)
-                        return info
+                        return info, variants
                 except Exception:
                     pass
         # try a contains-style match: if any lookup key is substring of token or vice-versa
-        for k in list(lookup.keys()):
-            try:
-                if k and p and (k in p or p in k):
-                    if DEBUG:
-                        print("[TAGDEBUG] contains heuristic hit:", k, "for token", p)
-                    return lookup.get(k)
-            except Exception:
-                pass
-        return None
+        if matcher is not None and isinstance(p, str):
+            k = matcher.find(p)
+            if k is not None:
+                if DEBUG:
+                    print("[TAGDEBUG] contains heuristic hit:", k, "for token", p)
+                return lookup.get(k), variants
+        return None, variants
+
+    # hot-loop aliases: locals instead of global/attribute lookups per token
+    lookup_get = lookup.get
+    variants_for = _variants_for_token
+    find_entry = _find_entry_and_variants
+    color_from_entry = _color_from_mapping_entry
+    ensure_rgb = _ensure_rgb
+    normalize_tag = _normalize_tag_dict
+    getrgb = _getrgb_cached
+    token_hits = _load_tagfast()
+
+    # Without a lookup or mapping function the name-token fallback (step 4) can never
+    # find anything, so skip it; explicit tags and tag_text are still handled.
+    have_mappings = bool(lookup) or mapping_func is not None
 
     enriched = []
     for ev in events:
-        ev_copy = dict(ev)
+        # events are only copied when tags are added (dict(ev, tags=...)); untouched
+        # events are passed through as-is
 
         # 1) If ev already has structured tags, normalize them and keep
-        if ev_copy.get("tags"):
+        if ev.get("tags"):
             try:
                 norm = []
-                for t in ev_copy.get("tags"):
-                    if not isinstance(t, dict):
-                        continue
-                    te = {"text": str(t.get("text") or "").strip()}
-                    if t.get("color_rgb") is not None:
-                        try:
-                            te["color_rgb"] = _ensure_rgb(t["color_rgb"])
-                        except Exception:
-                            pass
-                    elif t.get("color_name"):
-                        try:
-                            rgb = ImageColor.getrgb(str(t.get("color_name")))
-                            te["color_rgb"] = (int(rgb[0]), int(rgb[1]), int(rgb[2]))
-                        except Exception:
-                            pass
-                    norm.append(te)
-                if norm:
-                    ev_copy["tags"] = norm
-                enriched.append(ev_copy)
+                for t in ev.get("tags"):
+                    te = normalize_tag(t)
+                    if te:
+                        norm.append(te)
+                enriched.append(dict(ev, tags=norm) if norm else ev)
                 continue
             except Exception:
                 pass
@@ -983,42 +1647,29 @@ def enrich_events_with_tags(events, EVENT_MAPPINGS=None, prefer_mapping_module=T
         # 2) Try mapping_func for full summary first (may return structured tags)
         try:
             if mapping_func and prefer_mapping_module:
-                mapped = mapping_func(ev_copy.get("name") or ev_copy.get("display_text") or "")
+                mapped = mapping_func(ev.get("name") or ev.get("display_text") or "")
                 if isinstance(mapped, dict) and mapped.get("tags"):
                     out_tags = []
                     for t in mapped.get("tags"):
-                        if not isinstance(t, dict):
-                            continue
-                        te = {"text": str(t.get("text") or "").strip()}
-                        if t.get("color_rgb") is not None:
-                            try:
-                                te["color_rgb"] = _ensure_rgb(t["color_rgb"])
-                            except Exception:
-                                pass
-                        elif t.get("color_name"):
-                            try:
-                                rgb = ImageColor.getrgb(str(t.get("color_name")))
-                                te["color_rgb"] = (int(rgb[0]), int(rgb[1]), int(rgb[2]))
-                            except Exception:
-                                pass
-                        out_tags.append(te)
+                        te = normalize_tag(t)
+                        if te:
+                            out_tags.append(te)
                     if out_tags:
-                        ev_copy["tags"] = out_tags
-                        enriched.append(ev_copy)
+                        enriched.append(dict(ev, tags=out_tags))
                         continue
         except Exception:
             pass
 
         # 3) If explicit tag_text exists, split by commas and honor legacy color if given
-        raw = ev_copy.get("tag_text") or ev_copy.get("tag") or ""
+        raw = ev.get("tag_text") or ev.get("tag") or ""
         parts = _split_tag_text_into_tokens(raw)
 
         tags_out = []
         legacy_rgb = None
-        legacy_name = ev_copy.get("tag_color_name")
-        if ev_copy.get("tag_color_rgb") is not None:
+        legacy_name = ev.get("tag_color_name")
+        if ev.get("tag_color_rgb") is not None:
             try:
-                legacy_rgb = _ensure_rgb(ev_copy["tag_color_rgb"])
+                legacy_rgb = ensure_rgb(ev["tag_color_rgb"])
             except Exception:
                 legacy_rgb = None
 
@@ -1028,19 +1679,19 @@ def enrich_events_with_tags(events, EVENT_MAPPINGS=None, prefer_mapping_module=T
                     continue
                 color_rgb = None
                 # tolerant lookup via helper
-                entry = _find_entry_for_token(p)
+                entry, _ = find_entry(p)
                 if entry:
-                    color_rgb = _color_from_mapping_entry(entry)
+                    color_rgb = color_from_entry(entry)
                 # mapping_func on token as fallback
                 if color_rgb is None and mapping_func:
                     try:
                         info = mapping_func(p)
                         if isinstance(info, dict):
-                            color_rgb = _color_from_mapping_entry(info)
+                            color_rgb = color_from_entry(info)
                             if color_rgb is None and info.get("tags"):
                                 try:
                                     t0 = info.get("tags")[0]
-                                    color_rgb = _color_from_mapping_entry(t0) or color_rgb
+                                    color_rgb = color_from_entry(t0) or color_rgb
                                 except Exception:
                                     pass
                     except Exception:
@@ -1049,12 +1700,9 @@ def enrich_events_with_tags(events, EVENT_MAPPINGS=None, prefer_mapping_module=T
                 if color_rgb is None and legacy_rgb is not None:
                     color_rgb = legacy_rgb
                 elif color_rgb is None and legacy_name:
-                    try:
-                        color_rgb = ImageColor.getrgb(str(legacy_name))
-                    except Exception:
-                        color_rgb = None
+                    color_rgb = getrgb(_s(legacy_name))
 
-                tag_entry = {"text": str(p).strip()}
+                tag_entry = {"text": _s(p).strip()}
                 # propagate icon/mode from mapping entry if present (so renderer can draw icons)
                 try:
                     if entry and isinstance(entry, dict):
@@ -1066,47 +1714,42 @@ def enrich_events_with_tags(events, EVENT_MAPPINGS=None, prefer_mapping_module=T
                             tag_entry["mode"] = m
                 except Exception:
                     pass
+                # every source above already yields a normalized (r, g, b) tuple
                 if color_rgb is not None:
-                    try:
-                        tag_entry["color_rgb"] = _ensure_rgb(color_rgb)
-                    except Exception:
-                        pass
+                    tag_entry["color_rgb"] = color_rgb
                 tags_out.append(tag_entry)
             if tags_out:
-                ev_copy["tags"] = tags_out
-                enriched.append(ev_copy)
+                enriched.append(dict(ev, tags=tags_out))
                 continue
 
+        if not have_mappings:
+            enriched.append(ev)
+            continue
+
         # 4) CONSERVATIVE FALLBACK: scan tokens in name but only accept them
-        name_source = ev_copy.get("name") or ev_copy.get("original_name") or ""
-        tokens = [t.strip() for t in re.split(r"[,\s\-\:]+", str(name_source)) if t.strip()]
+        name_source = ev.get("name") or ev.get("original_name") or ""
+        if not name_source:
+            enriched.append(ev)
+            continue
+        # the split already eats whitespace, so only the length filter is needed
+        tokens = [t for t in _TOK_SPLIT_RE.split(_s(name_source)) if 2 <= len(t) <= 30]
         found = []
-        for t in tokens:
-            if not t:
-                continue
-            # only consider short tokens (avoid long fragments)
-            if len(t) > 30 or len(t) < 2:
-                continue
-            # try tolerant lookup
-            entry = None
-            for candidate in _variants_for_token(t):
-                entry = lookup.get(candidate) or lookup.get(candidate.lower())
-                if entry:
-                    break
+        # short tokens only (2..30 chars), each with its lookup hit and variants
+        for t, entry, variants in token_hits(tokens, lookup):
             color_rgb = None
             if entry:
-                color_rgb = _color_from_mapping_entry(entry)
+                color_rgb = color_from_entry(entry)
             # else ask mapping_func for the token (if available)
             if color_rgb is None and mapping_func:
                 try:
-                    for candidate in _variants_for_token(t):
+                    for candidate in variants:
                         info = mapping_func(candidate)
                         if isinstance(info, dict):
-                            color_rgb = _color_from_mapping_entry(info)
+                            color_rgb = color_from_entry(info)
                             if color_rgb is None and info.get("tags"):
                                 try:
                                     t0 = info.get("tags")[0]
-                                    color_rgb = _color_from_mapping_entry(t0) or color_rgb
+                                    color_rgb = color_from_entry(t0) or color_rgb
                                 except Exception:
                                     pass
                             # accept only if mapping suggests it is a tag/replacement
@@ -1117,19 +1760,16 @@ def enrich_events_with_tags(events, EVENT_MAPPINGS=None, prefer_mapping_module=T
                 except Exception:
                     pass
             if color_rgb is not None:
-                found.append((t, color_rgb))
+                found.append((t, color_rgb, variants))
 
         if found:
-            out_tags = ev_copy.get("tags") or []
-            for t, c in found:
-                te = {"text": str(t)}
-                try:
-                    te["color_rgb"] = _ensure_rgb(c)
-                except Exception:
-                    pass
+            out_tags = list(ev.get("tags") or [])
+            for t, c, variants in found:
+                # c comes from _color_from_mapping_entry, already an (r, g, b) tuple
+                te = {"text": t, "color_rgb": c}
                 # try to attach icon/mode from mapping lookup for this token
                 try:
-                    entry_for_t = _find_entry_for_token(t)
+                    entry_for_t, _ = find_entry(t, variants)
                     if entry_for_t and isinstance(entry_for_t, dict):
                         icon_name = entry_for_t.get("icon") or entry_for_t.get("icon_name")
                         if icon_name:
@@ -1140,9 +1780,9 @@ def enrich_events_with_tags(events, EVENT_MAPPINGS=None, prefer_mapping_module=T
                 except Exception:
                     pass
                 out_tags.append(te)
-            ev_copy["tags"] = out_tags
-
-        enriched.append(ev_copy)
+            enriched.append(dict(ev, tags=out_tags))
+        else:
+            enriched.append(ev)
 
     return enriched
 
@@ -1156,138 +1796,146 @@ def initial_fetch_all(days=DEFAULT_DAYS, session=None, gatenavn=None, husnr=None
     import os
     from datetime import datetime
 
-    s = session or requests.Session()
-    try:
-        # fetch initial data
-        fractions = fetch_fraction_names(session=s)
-        tomme = fetch_tommekalender_events(fractions, days=days, session=s, gatenavn=gatenavn, husnr=husnr)
-        gcal = fetch_google_calendar_events(days=days, session=s)
+    s = session or _SESSION
 
-        
-        # fetch public holidays (Norway calendar by default)
-        holidays = []
+    def _holidays():
+        # public holidays (Norway calendar by default)
         try:
-            holidays = fetch_google_holiday_events(calendar_id=HOLIDAYS_CALENDAR_ID, days=days, session=s)
+            return fetch_google_holiday_events(calendar_id=HOLIDAYS_CALENDAR_ID, days=days, session=s)
         except Exception:
-            holidays = []
-# fetch weather: (weather, hourly, meta) expected from your provider function
-        weather, hourly, meta = fetch_weather_from_provider(lat=LAT, lon=LON, days=days)
+            return []
 
-        # --- Ensure hourly entries include 'condition' and 'precip' for renderer ---
-        try:
-            # Normalize keys and fill missing fields so renderer can map icons
-            hourly = hourly or []
-            for h in hourly:
-                # ensure precip is present (many providers use precip_mm or precipitation)
-                if h.get("precip") is None:
-                    if h.get("precip_mm") is not None:
-                        h["precip"] = h.get("precip_mm")
-                    elif h.get("precipitation") is not None:
-                        h["precip"] = h.get("precipitation")
-                    else:
-                        h["precip"] = 0.0
-
-                # ensure temperature field is normalized
-                if h.get("temp") is None:
-                    if h.get("temperature") is not None:
-                        h["temp"] = h.get("temperature")
-                    elif h.get("air_temperature") is not None:
-                        h["temp"] = h.get("air_temperature")
-
-                # ensure there's a condition string; try matching daily summary first
-                if not h.get("condition"):
-                    # try find the day summary for this hour (match by date prefix YYYY-MM-DD)
-                    t = h.get("time") or h.get("dt") or h.get("datetime")
+    # fetch initial data side by side; only tommekalender waits (for the fraction names)
+    with ThreadPoolExecutor(max_workers=5) as ex:
+        f_fractions = ex.submit(fetch_fraction_names, session=s)
+        f_gcal = ex.submit(fetch_google_calendar_events, days=days, session=s)
+        f_holidays = ex.submit(_holidays)
+        # weather: (weather, hourly, meta) expected from your provider function
+        f_weather = ex.submit(fetch_weather_from_provider, lat=LAT, lon=LON, days=days)
+        f_tomme = ex.submit(
+            lambda: fetch_tommekalender_events(f_fractions.result(), days=days, session=s,
+                                               gatenavn=gatenavn, husnr=husnr))
+        tomme = f_tomme.result()
+        gcal = f_gcal.result()
+        holidays = f_holidays.result()
+        weather, hourly, meta = f_weather.result()
+
+    # --- Ensure hourly entries include 'condition' and 'precip' for renderer ---
+    try:
+        # Normalize keys and fill missing fields so renderer can map icons
+        hourly = hourly or []
+        # daily entries by date (first one wins, like the old linear search)
+        by_date = {}
+        for d in (weather or []):
+            if d.get("date"):
+                by_date.setdefault(d.get("date"), d)
+        for h in hourly:
+            # ensure precip is present (many providers use precip_mm or precipitation)
+            if h.get("precip") is None:
+                if h.get("precip_mm") is not None:
+                    h["precip"] = h.get("precip_mm")
+                elif h.get("precipitation") is not None:
+                    h["precip"] = h.get("precipitation")
+                else:
+                    h["precip"] = 0.0
+
+            # ensure temperature field is normalized
+            if h.get("temp") is None:
+                if h.get("temperature") is not None:
+                    h["temp"] = h.get("temperature")
+                elif h.get("air_temperature") is not None:
+                    h["temp"] = h.get("air_temperature")
+
+            # ensure there's a condition string; try matching daily summary first
+            if not h.get("condition"):
+                # try find the day summary for this hour (match by date prefix YYYY-MM-DD)
+                t = h.get("time") or h.get("dt") or h.get("datetime")
+                date_str = None
+                if isinstance(t, str) and len(t) >= 10:
+                    date_str = t[:10]
+                elif isinstance(t, (int, float)):
+                    # if time is hour index or epoch, we don't try to match day summary
                     date_str = None
-                    if isinstance(t, str) and len(t) >= 10:
-                        date_str = t[:10]
-                    elif isinstance(t, (int, float)):
-                        # if time is hour index or epoch, we don't try to match day summary
-                        date_str = None
-
-                    day_entry = None
-                    if date_str and weather:
-                        for d in weather:
-                            if d.get("date") == date_str:
-                                day_entry = d
-                                break
-                    if day_entry and (day_entry.get("condition") or day_entry.get("symbol")):
-                        # prefer daily textual condition if available
-                        h["condition"] = day_entry.get("condition") or day_entry.get("symbol")
+
+                day_entry = by_date.get(date_str) if date_str else None
+                if day_entry and (day_entry.get("condition") or day_entry.get("symbol")):
+                    # prefer daily textual condition if available
+                    h["condition"] = day_entry.get("condition") or day_entry.get("symbol")
+                else:
+                    # fallback heuristic: if temp exists and <= 0 -> 'Skyet' (or 'Snø' if heavy precip)
+                    tval = h.get("temp")
+                    pval = h.get("precip", 0.0) or 0.0
+                    if pval >= 2.5:
+                        # heavy precip — guess rain or snow depending on temp
+                        h["condition"] = "Regn" if (tval is None or tval > 1.5) else "Snø"
                     else:
-                        # fallback heuristic: if temp exists and <= 0 -> 'Skyet' (or 'Snø' if heavy precip)
-                        tval = h.get("temp")
-                        pval = h.get("precip", 0.0) or 0.0
-                        if pval >= 2.5:
-                            # heavy precip — guess rain or snow depending on temp
-                            h["condition"] = "Regn" if (tval is None or tval > 1.5) else "Snø"
+                        if tval is None:
+                            h["condition"] = "Skyet"
                         else:
-                            if tval is None:
+                            # use a slightly more descriptive guess
+                            if tval <= -1.5:
                                 h["condition"] = "Skyet"
+                            elif tval <= 0.5:
+                                h["condition"] = "Delvis skyet"
                             else:
-                                # use a slightly more descriptive guess
-                                if tval <= -1.5:
-                                    h["condition"] = "Skyet"
-                                elif tval <= 0.5:
-                                    h["condition"] = "Delvis skyet"
-                                else:
-                                    h["condition"] = "Klarvær"
-        except Exception:
-            # don't break the whole fetch if something odd happens here
-            pass
-
-        # merge events (tommekalender + gcal)
-        events = []
-        # merge events (tommekalender + gcal + holidays) - normalize everything first
-        events = []
-        for raw in (gcal or []) + (tomme or []) + (holidays or []):
-            ne = normalize_event(raw)
-            key_exists = any(
-                (x.get('date') == ne.get('date') and x.get('name') == ne.get('name') and x.get('time', '') == ne.get('time',''))
-                for x in events
-            )
-            if not key_exists:
-                events.append(ne)
-        events.sort(key=lambda e: (e.get('date') or "", e.get('time') or ""))
+                                h["condition"] = "Klarvær"
+    except Exception:
+        # don't break the whole fetch if something odd happens here
+        pass
 
-        
-        
-        # ---- ENRICH events with structured tags (so renderer can color per-tag) ----
-        try:
-            # Prefer EVENT_MAPPINGS exported from mappings module if available.
-            em = None
-            try:
-                # import mappings module explicitly and read its EVENT_MAPPINGS
-                import mappings as _m
-                em = getattr(_m, "EVENT_MAPPINGS", None)
-                # If EVENT_MAPPINGS is empty, optionally call a reload helper if provided (useful in dev)
-                if (em is None or (isinstance(em, (list, tuple)) and len(em) == 0)) and hasattr(_m, "reload_event_mappings"):
-                    try:
-                        _m.reload_event_mappings(force_refresh=False)
-                        em = getattr(_m, "EVENT_MAPPINGS", None)
-                    except Exception:
-                        pass
-            except Exception:
-                # fallback to any global EVENT_MAPPINGS
-                em = globals().get("EVENT_MAPPINGS")
+    # merge events (tommekalender + gcal)
+    events = []
+    # merge events (tommekalender + gcal + holidays) - normalize everything first
+    events = []
+    seen = set()
+    for raw in (gcal or []) + (tomme or []) + (holidays or []):
+        ne = normalize_event(raw)
+        key = (ne.get('date'), ne.get('name'), ne.get('time', ''))
+        if key not in seen:
+            seen.add(key)
+            events.append(ne)
+    events.sort(key=lambda e: (e.get('date') or "", e.get('time') or ""))
 
-            # final fallback to global var if still None
-            if em is None:
-                em = globals().get("EVENT_MAPPINGS")
 
-            events = enrich_events_with_tags(events, EVENT_MAPPINGS=em, prefer_mapping_module=True)
-        except Exception:
-            # fail gracefully: keep original events
-            pass
 
-        # renderer-safe fallback: ensure name exists (in case mapping removed it)
+    # ---- ENRICH events with structured tags (so renderer can color per-tag) ----
+    try:
+        # Prefer EVENT_MAPPINGS exported from mappings module if available.
+        em = None
         try:
-            for ev in events:
-                if not ev.get("name") and ev.get("display_text"):
-                    ev["name"] = ev["display_text"]
+            # import mappings module explicitly and read its EVENT_MAPPINGS
+            import mappings as _m
+            em = getattr(_m, "EVENT_MAPPINGS", None)
+            # If EVENT_MAPPINGS is empty, optionally call a reload helper if provided (useful in dev)
+            if (em is None or (isinstance(em, (list, tuple)) and len(em) == 0)) and hasattr(_m, "reload_event_mappings"):
+                try:
+                    _m.reload_event_mappings(force_refresh=False)
+                    clear_mapping_cache()
+                    em = getattr(_m, "EVENT_MAPPINGS", None)
+                except Exception:
+                    pass
         except Exception:
-            pass
-# DEBUG: dump first weather entry for debugging and produce hourly preview + period picks
+            # fallback to any global EVENT_MAPPINGS
+            em = globals().get("EVENT_MAPPINGS")
+
+        # final fallback to global var if still None
+        if em is None:
+            em = globals().get("EVENT_MAPPINGS")
+
+        events = enrich_events_with_tags(events, EVENT_MAPPINGS=em, prefer_mapping_module=True)
+    except Exception:
+        # fail gracefully: keep original events
+        pass
+
+    # renderer-safe fallback: ensure name exists (in case mapping removed it)
+    try:
+        for ev in events:
+            if not ev.get("name") and ev.get("display_text"):
+                ev["name"] = ev["display_text"]
+    except Exception:
+        pass
+    # DEBUG (DEBUG_WEATHER=1): dump first weather entry, hourly preview + period picks
+    if _DEBUG_WEATHER:
         try:
             if weather:
                 print("[DEBUG weather sample] first weather entry:", weather[0])
@@ -1297,101 +1945,80 @@ def initial_fetch_all(days=DEFAULT_DAYS, session=None, gatenavn=None, husnr=None
         except Exception:
             print("[DEBUG] failed to print weather debug")
 
-            # compact preview of first 24 entries
-            try:
-                print("[DEBUG hourly entries preview] (index, time, cond, temp, precip)")
-                for i, h in enumerate((hourly or [])[:24]):
-                    t = h.get("time") or h.get("dt") or h.get("datetime") or h.get("hour") or "<no-time>"
-                    cond = h.get("condition") or h.get("symbol") or h.get("weather") or ""
-                    temp = h.get("temp") or h.get("temperature") or None
-                    precip = h.get("precip") if h.get("precip") is not None else h.get("precip_mm", None)
-                    print(f"  {i:02d}: {t} | {cond!r:30} | temp={str(temp):>6} | precip={str(precip)}")
-            except Exception as ex:
-                print("[DEBUG] failed to print hourly summary:", ex)
-
-            # quick representative selection check (simple heuristics)
-            try:
-                def _norm_cond_key(cond):
-                    if not cond:
-                        return "cloud"
-                    c = str(cond).lower()
-                    if "rain" in c or "regn" in c or "byge" in c:
-                        return "rain"
-                    if "snow" in c or "snø" in c:
-                        return "snow"
-                    if "sun" in c or "klar" in c:
-                        return "sun"
-                    if "thun" in c or "lyn" in c:
-                        return "thunder"
-                    if "fog" in c or "tåke" in c:
-                        return "fog"
-                    if "cloud" in c or "sky" in c or "skyet" in c:
-                        return "cloud"
-                    return "cloud"
-
-                def _choose_for_period(hours):
-                    if not hours:
-                        return None
-                    rank = {"sun":0, "cloud":1, "rain":2, "snow":3, "thunder":4}
-                    best = None
-                    best_rank = -1
-                    for hh in hours:
-                        key = _norm_cond_key(hh.get("condition") or hh.get("symbol") or hh.get("weather"))
-                        r = rank.get(key, 1)
-                        precip = hh.get("precip") or hh.get("precip_mm") or 0.0
-                        if best is None or (r > best_rank) or (r == best_rank and (precip or 0) > (best.get("precip") or 0)):
-                            best_rank = r
-                            best = {"hour": hh, "key": key, "precip": precip}
-                    return best
-
-                # naive split by hour-of-day; fallback to index-based distribution if no proper time field
-                periods = {"morning":[], "lunch":[], "day":[], "evening":[]}
-                for idx, hh in enumerate(hourly or []):
-                    t = hh.get("time")
-                    hour = None
-                    if isinstance(t, str):
-                        try:
-                            hour = int(datetime.fromisoformat(t.replace("Z", "+00:00")).hour)
-                        except Exception:
-                            hour = None
-                    elif isinstance(t, (int, float)):
-                        try:
-                            hour = int(t)
-                        except Exception:
-                            hour = None
-                    if hour is None:
-                        # distribute by index along 24h
-                        pos = idx % 24
-                        hour = pos
-
-                    if 6 <= hour <= 10:
-                        periods["morning"].append(hh)
-                    elif 11 <= hour <= 13:
-                        periods["lunch"].append(hh)
-                    elif 14 <= hour <= 17:
-                        periods["day"].append(hh)
-                    else:
-                        periods["evening"].append(hh)
-
-                for name in ("morning","lunch","day","evening"):
-                    rep = _choose_for_period(periods[name])
-                    if rep:
-                        hh = rep["hour"]
-                        t = hh.get("time") or hh.get("dt") or "<no-time>"
-                        print(f"[DEBUG chosen] {name:7} -> {t} {rep['key']} precip={rep['precip']}")
-                    else:
-                        print(f"[DEBUG chosen] {name:7} -> <no data>")
-            except Exception as ex:
-                print("[DEBUG] rep selection failed:", ex)
+        # compact preview of first 24 entries
+        try:
+            print("[DEBUG hourly entries preview] (index, time, cond, temp, precip)")
+            for i, h in enumerate((hourly or [])[:24]):
+                t = h.get("time") or h.get("dt") or h.get("datetime") or h.get("hour") or "<no-time>"
+                cond = h.get("condition") or h.get("symbol") or h.get("weather") or ""
+                temp = h.get("temp") or h.get("temperature") or None
+                precip = h.get("precip") if h.get("precip") is not None else h.get("precip_mm", None)
+                print(f"  {i:02d}: {t} | {cond!r:30} | temp={str(temp):>6} | precip={str(precip)}")
+        except Exception as ex:
+            print("[DEBUG] failed to print hourly summary:", ex)
 
+        # quick representative selection check (simple heuristics)
+        try:
+            def _norm_cond_key(cond):
+                if not cond:
+                    return "cloud"
+                c = str(cond).lower()
+                if "rain" in c or "regn" in c or "byge" in c:
+                    return "rain"
+                if "snow" in c or "snø" in c:
+                    return "snow"
+                if "sun" in c or "klar" in c:
+                    return "sun"
+                if "thun" in c or "lyn" in c:
+                    return "thunder"
+                if "fog" in c or "tåke" in c:
+                    return "fog"
+                if "cloud" in c or "sky" in c or "skyet" in c:
+                    return "cloud"
+                return "cloud"
+
+            # one pass: bucket each hour by period and keep a running best per period
+            # (higher rank wins; on a tie, more precipitation wins)
+            rank = {"sun":0, "cloud":1, "rain":2, "snow":3, "thunder":4}
+            bests = {"morning": None, "lunch": None, "day": None, "evening": None}
+            for idx, hh in enumerate(hourly or []):
+                t = hh.get("time")
+                hour = None
+                if isinstance(t, str):
+                    try:
+                        hour = int(datetime.fromisoformat(t.replace("Z", "+00:00")).hour)
+                    except Exception:
+                        hour = None
+                elif isinstance(t, (int, float)):
+                    try:
+                        hour = int(t)
+                    except Exception:
+                        hour = None
+                if hour is None:
+                    # distribute by index along 24h
+                    hour = idx % 24
+                name = _PERIOD_BY_HOUR[hour] if 0 <= hour < 24 else "evening"
+
+                key = _norm_cond_key(hh.get("condition") or hh.get("symbol") or hh.get("weather"))
+                r = rank.get(key, 1)
+                precip = hh.get("precip") or hh.get("precip_mm") or 0.0
+                best = bests[name]
+                if best is None or (r > best["rank"]) or (r == best["rank"] and (precip or 0) > (best["precip"] or 0)):
+                    bests[name] = {"hour": hh, "key": key, "precip": precip, "rank": r}
+
+            for name in ("morning","lunch","day","evening"):
+                rep = bests[name]
+                if rep:
+                    hh = rep["hour"]
+                    t = hh.get("time") or hh.get("dt") or "<no-time>"
+                    print(f"[DEBUG chosen] {name:7} -> {t} {rep['key']} precip={rep['precip']}")
+                else:
+                    print(f"[DEBUG chosen] {name:7} -> <no data>")
         except Exception as ex:
-            print("[DEBUG] hourly debug block failed:", ex)
+            print("[DEBUG] rep selection failed:", ex)
 
-        return {"events": events, "weather": weather, "hourly_today": hourly, "meta": meta}
+    return {"events": events, "weather": weather, "hourly_today": hourly, "meta": meta}
 
-    finally:
-        if session is None:
-            s.close()
 
 
 # --------------------------------------------------------------------
@@ -1418,19 +2045,8 @@ if __name__ == "__main__":
         print("icon_color_rgb:", repr(e.get("icon_color_rgb")))
 
 
-def fetch_google_holiday_events(calendar_id=None, days=DEFAULT_DAYS, session=None):
-    """
-    Fetch public-holiday (all-day) events from a given Google Calendar ID.
-    The summary is prefixed with "Fridag: " to trigger custom mapping logic.
-    """
-    import requests
-    from datetime import datetime, timedelta
-
-    session = session or requests.Session()
-    cal_id = calendar_id or HOLIDAYS_CALENDAR_ID
-    # ensure '#' is URL encoded for use in URL
-    encoded_cal_id = cal_id.replace("#", "%23")
-
+def _holiday_request(cal_id, days):
+    """(url, params, query_start_date) for a holiday query covering `days` from local midnight today."""
     today_local = now_local().date()
     if TZ:
         start_local_dt = datetime(year=today_local.year, month=today_local.month, day=today_local.day,
@@ -1445,167 +2061,218 @@ def fetch_google_holiday_events(calendar_id=None, days=DEFAULT_DAYS, session=Non
 
     timeMin = iso_z(start_utc)
     timeMax = iso_z(end_utc)
-    url = (
-        f"https://www.googleapis.com/calendar/v3/calendars/{encoded_cal_id}/events"
-        f"?timeMin={timeMin}&timeMax={timeMax}&singleEvents=true&fields=items(summary,start,end)&orderBy=startTime&key={API_KEY_GOOGLE}"
+    # the path stays the same for a calendar; everything that varies goes through params
+    url = f"https://www.googleapis.com/calendar/v3/calendars/{quote(cal_id, safe='')}/events"
+    params = {
+        "timeMin": timeMin,
+        "timeMax": timeMax,
+        "singleEvents": "true",
+        "fields": "items(summary,start,end)",
+        "orderBy": "startTime",
+        "key": API_KEY_GOOGLE,
+    }
+    # query_start_date used to skip past multi-day events that start earlier
+    try:
+        query_start_date = start_local_dt.date()
+    except Exception:
+        query_start_date = now_local().date()
+    return url, params, query_start_date
+
+
+class HolidayEvent(NamedTuple):
+    """En fridag slik _parse_holiday_items bygger den; blir til en vanlig event-dict via to_dict()."""
+    date: str
+    name: str
+    display_text: Optional[str]
+    tag_text: Optional[str]
+    tag_color_name: Optional[str]
+    tag_color_rgb: Any
+    time: str = ""
+    icon: Optional[str] = None
+    icon_size: Any = None
+    icon_color_name: Optional[str] = None
+    icon_color_rgb: Any = None
+    icon_mode: Optional[str] = None
+    original_name: str = ""
+    is_holiday: bool = True  # explicit holiday flag
+
+    def to_dict(self):
+        # Renderer/enrich/server muterer og serialiserer events som dicts
+        return dict(zip(self._fields, self))
+
+
+def _make_holiday_ev(date_str, mapped, summary):
+    """HolidayEvent for one day of a holiday, from its apply_event_mapping result."""
+    return HolidayEvent(
+        date=date_str,
+        name=mapped.get("display_text") or "",
+        display_text=mapped.get("display_text"),
+        tag_text=mapped.get("tag_text"),
+        tag_color_name=mapped.get("tag_color_name"),
+        tag_color_rgb=mapped.get("tag_color_rgb"),
+        icon=mapped.get("icon"),
+        icon_size=mapped.get("icon_size"),
+        icon_color_name=mapped.get("icon_color_name"),
+        icon_color_rgb=mapped.get("icon_color_rgb"),
+        icon_mode=mapped.get("mode"),
+        original_name=summary,
     )
 
+
+def _parse_holiday_items(items, query_start_date):
+    """Turn Google Calendar holiday items into sorted, de-duplicated per-day events."""
     holidays = []
-    try:
-        r = session.get(url, timeout=10)
-        if r.status_code != 200:
-            return []
-        data = r.json()
-        items = data.get("items", [])
-        # query_start_date used to skip past multi-day events that start earlier
-        try:
-            query_start_date = start_local_dt.date()
-        except Exception:
-            query_start_date = now_local().date()
+    seen = set()  # (date, name, time) already added
+    for it in items:
+        summary = (it.get("summary") or "").strip()
+        if not summary:
+            continue
+
+        # --- FIX: Prepend "Fridag: " to summary to trigger mapping logic ---
+        holiday_summary = "Fridag: " + summary
+        # --------------------------------------------------------------------
+
+        start = it.get("start", {})
+        end = it.get("end", {})
+
+        # Prefer all-day date events; but if dateTime present, treat defensively.
+        if "date" in start:
+            sdate = start["date"]
+            edate = end.get("date", sdate)
+            try:
+                sdt = _parse_iso_date(sdate)
+                edt = _parse_iso_date(edate)
+            except Exception:
+                sdt = None
+                edt = None
 
-        for it in items:
-            summary = (it.get("summary") or "").strip()
-            if not summary:
-                continue
+            # If parsing failed, include if not obviously out-of-range
+            if sdt is None or edt is None:
+                date_str = sdate
+                try:
+                    if _parse_iso_date(date_str) < query_start_date:
+                        continue
+                except Exception:
+                    pass
 
-            # --- FIX: Prepend "Fridag: " to summary to trigger mapping logic ---
-            holiday_summary = "Fridag: " + summary
-            # --------------------------------------------------------------------
+                # Apply event mapping using the prepended summary
+                mapped = apply_event_mapping(holiday_summary)
+                if mapped.get("filtered_out"):
+                    continue
+                ev = _make_holiday_ev(date_str, mapped, summary)
+                key = (ev.date, ev.name, ev.time)
+                if key not in seen:
+                    seen.add(key)
+                    holidays.append(ev)
+            else:
+                # Google calendar all-day events use exclusive end date, so last_day = edt - 1
+                last_day = edt - timedelta(days=1)
+                day = max(sdt, query_start_date)
+                # Apply event mapping using the prepended summary (same for every day)
+                mapped = apply_event_mapping(holiday_summary)
+                if mapped.get("filtered_out"):
+                    continue
+                for ordinal in range(day.toordinal(), last_day.toordinal() + 1):
+                    d = date.fromordinal(ordinal)
+                    date_str = f"{d.year:04d}-{d.month:02d}-{d.day:02d}"
+                    ev = _make_holiday_ev(date_str, mapped, summary)
+                    key = (ev.date, ev.name, ev.time)
+                    if key not in seen:
+                        seen.add(key)
+                        holidays.append(ev)
+        elif "dateTime" in start:
+            # Uncommon for a holiday calendar, but handle gracefully:
+            try:
+                dt_start = start.get("dateTime") or ""
+                date_str = dt_start[:10]
+            except Exception:
+                date_str = None
+            if date_str:
+                # Apply event mapping using the prepended summary
+                mapped = apply_event_mapping(holiday_summary)
+                if mapped.get("filtered_out"):
+                    continue
+                ev = _make_holiday_ev(date_str, mapped, summary)
+                key = (ev.date, ev.name, ev.time)
+                if key not in seen:
+                    seen.add(key)
+                    holidays.append(ev)
+    holidays.sort(key=lambda e: (e.date, e.time))
+    return [ev.to_dict() for ev in holidays]
 
-            start = it.get("start", {})
-            end = it.get("end", {})
 
-            # Prefer all-day date events; but if dateTime present, treat defensively.
-            if "date" in start:
-                sdate = start["date"]
-                edate = end.get("date", sdate)
-                try:
-                    sdt = datetime.strptime(sdate, "%Y-%m-%d").date()
-                    edt = datetime.strptime(edate, "%Y-%m-%d").date()
-                except Exception:
-                    sdt = None
-                    edt = None
+# cal_id -> ((url, params), etag, items) from the last 200 reply; one entry per calendar,
+# since timeMin (and so the query) moves every day
+_HOLIDAY_ETAGS = {}
 
-                # If parsing failed, include if not obviously out-of-range
-                if sdt is None or edt is None:
-                    date_str = sdate
-                    try:
-                        if datetime.strptime(date_str, "%Y-%m-%d").date() < query_start_date:
-                            continue
-                    except Exception:
-                        pass
 
-                    # Apply event mapping using the prepended summary
-                    mapped = apply_event_mapping(holiday_summary)
-                    if mapped.get("filtered_out"):
-                        continue
-                    ev = {
-                        "date": date_str,
-                        "name": mapped.get("display_text") or "",
-                        "display_text": mapped.get("display_text"),
-                        "tag_text": mapped.get("tag_text"),
-                        "tag_color_name": mapped.get("tag_color_name"),
-                        "tag_color_rgb": mapped.get("tag_color_rgb"),
-                        "time": "",
-                        "icon": mapped.get("icon"),
-                        "icon_size": mapped.get("icon_size"),
-                        "icon_color_name": mapped.get("icon_color_name"),
-                        "icon_color_rgb": mapped.get("icon_color_rgb"),
-                        "icon_mode": mapped.get("mode"),
-                        "original_name": summary,
-            "is_holiday": True,  # explicit holiday flag
-                    }
-                    if not any(e['date'] == ev['date'] and e['name'] == ev['name'] and e.get('time','') == ev['time'] for e in holidays):
-                        holidays.append(ev)
-                else:
-                    # Google calendar all-day events use exclusive end date, so last_day = edt - 1
-                    last_day = edt - timedelta(days=1)
-                    day = max(sdt, query_start_date)
-                    while day <= last_day:
-                        date_str = day.strftime("%Y-%m-%d")
-
-                        # Apply event mapping using the prepended summary
-                        mapped = apply_event_mapping(holiday_summary)
-                        if mapped.get("filtered_out"):
-                            day += timedelta(days=1)
-                            continue
-                        ev = {
-                            "date": date_str,
-                            "name": mapped.get("display_text") or "",
-                            "display_text": mapped.get("display_text"),
-                            "tag_text": mapped.get("tag_text"),
-                            "tag_color_name": mapped.get("tag_color_name"),
-                            "tag_color_rgb": mapped.get("tag_color_rgb"),
-                            "time": "",
-                            "icon": mapped.get("icon"),
-                            "icon_size": mapped.get("icon_size"),
-                            "icon_color_name": mapped.get("icon_color_name"),
-                            "icon_color_rgb": mapped.get("icon_color_rgb"),
-                            "icon_mode": mapped.get("mode"),
-                            "original_name": summary,
-            "is_holiday": True,  # explicit holiday flag
-                        }
-
-                        if not any(e['date'] == ev['date'] and e['name'] == ev['name'] and e.get('time','') == ev['time'] for e in holidays):
-                            holidays.append(ev)
-                        day += timedelta(days=1)
-            elif "dateTime" in start:
-                # Uncommon for a holiday calendar, but handle gracefully:
-                try:
-                    dt_start = start.get("dateTime") or ""
-                    date_str = dt_start[:10]
-                except Exception:
-                    date_str = None
-                if date_str:
-                    # Apply event mapping using the prepended summary
-                    mapped = apply_event_mapping(holiday_summary)
-                    if mapped.get("filtered_out"):
-                        continue
-                    ev = {
-                        "date": date_str,
-                        "name": mapped.get("display_text") or "",
-                        "display_text": mapped.get("display_text"),
-                        "tag_text": mapped.get("tag_text"),
-                        "tag_color_name": mapped.get("tag_color_name"),
-                        "tag_color_rgb": mapped.get("tag_color_rgb"),
-                        "time": "",
-                        "icon": mapped.get("icon"),
-                        "icon_size": mapped.get("icon_size"),
-                        "icon_color_name": mapped.get("icon_color_name"),
-                        "icon_color_rgb": mapped.get("icon_color_rgb"),
-                        "icon_mode": mapped.get("mode"),
-                        "original_name": summary,
-            "is_holiday": True,  # explicit holiday flag
-                    }
+def _holiday_conditional_headers(cal_id, request):
+    hit = _HOLIDAY_ETAGS.get(cal_id)
+    if hit and hit[0] == request:
+        return {"If-None-Match": hit[1]}
+    return {}
 
-                    if not any(e['date'] == ev['date'] and e['name'] == ev['name'] and e.get('time','') == ev['time'] for e in holidays):
-                        holidays.append(ev)
-        holidays.sort(key=lambda e: (e['date'], e.get('time', '')))
-        return holidays
+
+def _holiday_items_from_response(cal_id, request, r):
+    """items from a 200 reply (remembering its ETag) or the remembered ones on 304; None otherwise."""
+    if r.status_code == 304:
+        hit = _HOLIDAY_ETAGS.get(cal_id)
+        return hit[2] if hit and hit[0] == request else None
+    if r.status_code != 200:
+        return None
+    items = _loads(r.content).get("items", [])
+    etag = r.headers.get("ETag")
+    if etag:
+        _HOLIDAY_ETAGS[cal_id] = (request, etag, items)
+    return items
+
+
+@ttl_cached(24 * 3600)  # holiday calendars change at most daily; the key carries today's date
+def fetch_google_holiday_events(calendar_id=None, days=DEFAULT_DAYS, session=None):
+    """
+    Fetch public-holiday (all-day) events from a given Google Calendar ID.
+    The summary is prefixed with "Fridag: " to trigger custom mapping logic.
+    """
+    session = session or _SESSION
+    cal_id = calendar_id or HOLIDAYS_CALENDAR_ID
+    url, params, query_start_date = _holiday_request(cal_id, days)
+    request = (url, params)
+    try:
+        r = session.get(url, params=params, headers=_holiday_conditional_headers(cal_id, request), timeout=10)
+        items = _holiday_items_from_response(cal_id, request, r)
+        if items is None:
+            return []
+        # 304 gir de lagrede items; parses på nytt så endrede mappings slår inn
+        return _parse_holiday_items(items, query_start_date)
     except Exception as ex:
         print("[fetch_google_holiday_events] exception:", ex)
         return []
-    
+
+
 def initial_fetch_all(days=DEFAULT_DAYS, session=None, gatenavn=None, husnr=None):
     """ Master fetch function that combines all your logic """
-    s = session or requests.Session()
-    try:
-        fractions = fetch_fraction_names(session=s)
-        waste = fetch_tommekalender_events(fractions, days=days, session=s, gatenavn=gatenavn, husnr=husnr)
-        gcal = fetch_google_calendar_events(days=days, session=s)
-        
-        # Merge all events
-        all_events = gcal + waste
-        all_events.sort(key=lambda e: (e['date'], e.get('time', '')))
-
-        weather, hourly, meta = fetch_weather_from_provider(lat=LAT, lon=LON, days=days)
-        
-        return {
-            "events": all_events,
-            "weather": weather,
-            "hourly_today": hourly,
-            "meta": meta
-        }
-    finally:
-        if session is None:
-            s.close()
\ No newline at end of file
+    # The pooled module session is shared by all worker threads (GETs on a Session are thread-safe)
+    s = session or _SESSION
+    # The requests are independent except tommekalender, which needs the fraction names.
+    # Run them side by side so the total wait is roughly the slowest call, not the sum.
+    with ThreadPoolExecutor(max_workers=4) as ex:
+        f_fractions = ex.submit(fetch_fraction_names, session=s)
+        f_gcal = ex.submit(fetch_google_calendar_events, days=days, session=s)
+        f_weather = ex.submit(fetch_weather_from_provider, lat=LAT, lon=LON, days=days)
+        f_waste = ex.submit(
+            lambda: fetch_tommekalender_events(f_fractions.result(), days=days, session=s,
+                                               gatenavn=gatenavn, husnr=husnr))
+        gcal = f_gcal.result()
+        waste = f_waste.result()
+        weather, hourly, meta = f_weather.result()
+
+    # Merge all events
+    all_events = gcal + waste
+    all_events.sort(key=lambda e: (e['date'], e.get('time', '')))
+
+    return {
+        "events": all_events,
+        "weather": weather,
+        "hourly_today": hourly,
+        "meta": meta
+    }
\ No newline at end of file
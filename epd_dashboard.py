@@ -47,6 +47,20 @@ except Exception as e:
     log.warning("waveshare_epd import failed - running dry-run: %s", e)
     epd = None
 
+# Optional in-process systemd access (no fork+exec per tick); falls back to systemctl/journalctl
+try:
+    from pystemd.systemd1 import Unit as SystemdUnit
+except Exception:
+    SystemdUnit = None
+try:
+    from systemd import journal
+except Exception:
+    journal = None
+
+# journalctl 'short' month names (C locale) -> month number
+_MONTHS = {m: i for i, m in enumerate(
+    ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"), 1)}
+
 # helpers
 def run_cmd(cmd, timeout=6):
     try:
@@ -55,13 +69,45 @@ def run_cmd(cmd, timeout=6):
     except Exception:
         return ""
 
+def unit_is_active(unit):
+    """True if the systemd unit is active (D-Bus via pystemd, else systemctl)."""
+    if SystemdUnit is not None:
+        try:
+            u = SystemdUnit(unit.encode())
+            u.load()
+            return u.Unit.ActiveState == b"active"
+        except Exception:
+            pass
+    return run_cmd(f"systemctl is-active {unit}").strip() == "active"
+
+def last_journal_line(unit):
+    """Last journal line for unit in journalctl's 'short' format (python-systemd, else journalctl)."""
+    if journal is not None:
+        try:
+            reader = journal.Reader()
+            try:
+                reader.add_match(_SYSTEMD_UNIT=unit)
+                reader.seek_tail()
+                entry = reader.get_previous()
+            finally:
+                reader.close()
+            if entry:
+                ts = entry["__REALTIME_TIMESTAMP"].strftime("%b %d %H:%M:%S")
+                ident = entry.get("SYSLOG_IDENTIFIER") or entry.get("_COMM") or ""
+                pid = entry.get("_PID")
+                ident = f"{ident}[{pid}]" if pid else ident
+                return f"{ts} {entry.get('_HOSTNAME', '')} {ident}: {entry.get('MESSAGE', '')}"
+            return ""
+        except Exception:
+            pass
+    return run_cmd(f"journalctl -u {unit} -n 1 --no-pager --output=short")
+
 def get_server_status(unit=SERVICE_NAME):
     """Return dict with ok:bool and last_run:timestamp (or None) and last_journal_line"""
     out = {"ok": False, "last_run": None, "last_line": None}
     try:
-        active = run_cmd(f"systemctl is-active {unit}")
-        out["ok"] = (active.strip() == "active")
-        last = run_cmd(f"journalctl -u {unit} -n 1 --no-pager --output=short")
+        out["ok"] = unit_is_active(unit)
+        last = last_journal_line(unit)
         if last:
             out["last_line"] = last
             # parse timestamp (Mon DD HH:MM:SS)
@@ -70,8 +116,10 @@ def get_server_status(unit=SERVICE_NAME):
                 mon, day, tm = parts[0], parts[1], parts[2]
                 try:
                     curr_year = datetime.now().year
-                    dt = datetime.strptime(f"{mon} {day} {curr_year} {tm}", "%b %d %Y %H:%M:%S")
-                    out["last_run"] = dt.strftime("%Y-%m-%d %H:%M:%S")
+                    hh, mm, ss = tm.split(":")
+                    dt = datetime(curr_year, _MONTHS[mon], int(day), int(hh), int(mm), int(ss))
+                    out["last_run"] = (f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d} "
+                                       f"{dt.hour:02d}:{dt.minute:02d}:{dt.second:02d}")
                 except Exception:
                     out["last_run"] = None
     except Exception as e:
@@ -79,7 +127,21 @@ def get_server_status(unit=SERVICE_NAME):
     return out
 
 # robust text sizing for many PIL versions
+# (text, id(font)) -> size; fonts live for the whole process (see get_fonts), and the
+# clock/date/status strings repeat from tick to tick
+_text_sizes = {}
+
 def text_size(draw, text, font):
+    key = (text, id(font))
+    size = _text_sizes.get(key)
+    if size is None:
+        size = _measure_text(draw, text, font)
+        if len(_text_sizes) >= 256:
+            _text_sizes.clear()
+        _text_sizes[key] = size
+    return size
+
+def _measure_text(draw, text, font):
     try:
         # PIL/Pillow FreeTypeFont
         bbox = font.getbbox(text)
@@ -119,17 +181,41 @@ else:
     W, H = 200, 200
 log.info("Using display %sx%s (epd present: %s)", W, H, bool(epd))
 
+# fonts are parsed once per process
+_fonts = None
+
+def get_fonts():
+    global _fonts
+    if _fonts is None:
+        _fonts = {
+            "clock": load_font(FONT_BOLD, 36) or ImageFont.load_default(),
+            "date": load_font(FONT_REG, 24) or ImageFont.load_default(),
+            "status": load_font(FONT_BOLD, 36) or ImageFont.load_default(),
+            "small": load_font(FONT_REG, 16) or ImageFont.load_default(),
+            "label": load_font(FONT_REG, 24),
+        }
+    return _fonts
+
+# one reusable 1-bit framebuffer (+ draw context) per display size
+_framebuffers = {}
+
 # render: 2px outer frame; top half clock/date; bottom half serverstatus
 def render_dashboard_image(clock_dt, server_status, w=W, h=H):
-    im = Image.new("1", (w, h), 255)
-    draw = ImageDraw.Draw(im)
+    """Draw the dashboard. Returns a shared framebuffer: use it before the next call."""
+    fb = _framebuffers.get((w, h))
+    if fb is None:
+        im = Image.new("1", (w, h), 255)
+        fb = _framebuffers[(w, h)] = (im, ImageDraw.Draw(im))
+    im, draw = fb
+    draw.rectangle((0, 0, w-1, h-1), fill=255)
 
     # fonts
-    f_clock = load_font(FONT_BOLD, 36) or ImageFont.load_default()
-    f_date = load_font(FONT_REG, 24) or ImageFont.load_default()
-    f_status = load_font(FONT_BOLD, 36) or ImageFont.load_default()
-    f_small = load_font(FONT_REG, 16) or ImageFont.load_default()
-    f_label = load_font(FONT_REG, 24) 
+    fonts = get_fonts()
+    f_clock = fonts["clock"]
+    f_date = fonts["date"]
+    f_status = fonts["status"]
+    f_small = fonts["small"]
+    f_label = fonts["label"]
 
     # draw 2px frame (some PIL versions ignore width on '1' mode -> draw two rectangles)
     draw.rectangle((0,0,w-1,h-1), outline=0)
@@ -197,7 +283,7 @@ def render_dashboard_image(clock_dt, server_status, w=W, h=H):
 # main loop
 def main_loop():
     log.info("Starting main loop")
-    last_full = 0
+    last_full = None  # time.monotonic() of the last full refresh
     try:
         while True:
             now = datetime.now()
@@ -207,10 +293,10 @@ def main_loop():
 
             if epd:
                 try:
-                    if time.time() - last_full > FULL_REFRESH_MIN * 60:
+                    if last_full is None or time.monotonic() - last_full > FULL_REFRESH_MIN * 60:
                         log.info("Full refresh")
                         epd.display(epd.getbuffer(img))
-                        last_full = time.time()
+                        last_full = time.monotonic()
                     else:
                         if hasattr(epd, "displayPartial"):
                             epd.displayPartial(epd.getbuffer(img))
@@ -221,8 +307,9 @@ def main_loop():
             else:
                 log.info("Dry-run: image rendered (not sent to epd)")
 
-            sleep_for = POLL_SECONDS - (datetime.now().second % POLL_SECONDS)
-            time.sleep(sleep_for)
+            # sleep to the next wall-clock POLL_SECONDS boundary; using the fractional
+            # time (not just .second) avoids waking a hair early and rendering twice
+            time.sleep(POLL_SECONDS - time.time() % POLL_SECONDS)
     except KeyboardInterrupt:
         log.info("Interrupted")
     finally:
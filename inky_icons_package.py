@@ -1,8 +1,13 @@
 # inky_icons_package.py
 import os
 import io
+import hashlib
 import logging
+import threading
+import asyncio
 import requests
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 
 # The likely version of resvg_py on your system uses this simple import
@@ -15,101 +20,327 @@ except Exception:
     weather_to_icon = None
     color_to_rgb = None
 
+try:
+    import ahocorasick  # optional (pyahocorasick): C automaton for find_for_keyword
+except Exception:
+    ahocorasick = None
+
+try:
+    import httpx  # optional: HTTP/2 client; prefetch multiplexes the downloads over one connection
+except Exception:
+    httpx = None
+
 logger = logging.getLogger(__name__)
 
 ASSETS_DIR = os.path.join(os.path.dirname(__file__), "assets")
 ICONS_DIR = os.path.join(ASSETS_DIR, "icons")
+# How many resized (name, size) variants get_icon_image keeps (LRU)
+RESIZED_CACHE_MAX = 256
+# Rasterized SVGs are kept as PNGs here (inside icons_dir), keyed on a hash of (svg, size)
+RASTER_CACHE_DIRNAME = ".cache"
+# Parallel CDN downloads in prefetch (stays within requests' default pool of 10 connections)
+PREFETCH_WORKERS = 8
+
+
+def _httpx_client(cls, **kwargs):
+    """httpx.Client / AsyncClient with HTTP/2 when the optional 'h2' package is there."""
+    # unpkg answers @latest URLs with a 302; httpx (unlike requests) doesn't follow it by default
+    kwargs.setdefault("follow_redirects", True)
+    try:
+        return cls(http2=True, **kwargs)
+    except ImportError:
+        return cls(**kwargs)
+
+def _as_rgba(im):
+    """im as a loaded RGBA image; no convert() copy when it already is RGBA (resvg output, most icons)."""
+    if im.mode == "RGBA":
+        im.load()
+        return im
+    return im.convert("RGBA")
+
+# Resized icons at or below this many px per side use BILINEAR; Lanczos adds nothing visible there
+SMALL_ICON_PX = 32
+# PNGs taller than this are box-reduced in their own mode before the RGBA copy is made
+STRIP_HEIGHT = 2000
 
 class IconManager:
     def __init__(self, icons_dir=None, load_size=24):
         self.icons_dir = icons_dir or ICONS_DIR
         self.load_size = load_size
-        self._icons = {}
+        self._icons = {}       # name -> decoded image, filled on first use
+        self._icon_paths = {}  # name -> file in icons_dir
+        self._matcher = None  # built from the icon names on first find_for_keyword
+        self._resized = OrderedDict()  # (name, size) -> resized image, LRU
+        self._raster_cache_dir = os.path.join(self.icons_dir, RASTER_CACHE_DIRNAME)
+        self._session = requests.Session()  # keep-alive to the icon CDN across downloads
+        self._http = _httpx_client(httpx.Client, timeout=5) if httpx is not None else None
         
         if not os.path.exists(self.icons_dir):
             os.makedirs(self.icons_dir, exist_ok=True)
+
+        # pillow-simd reports versions like "9.5.0.postN"; log which build is actually loaded
+        logger.info("PIL build: %s (%s)", getattr(Image, "__version__", "?"),
+                    getattr(Image.core, "__file__", "?"))
             
         self._load_icons_from_dir()
     
-    def _process_file(self, path, size):
+    def _process_file(self, path, size, strip_height=STRIP_HEIGHT):
             """Standardizes icon loading using the confirmed 'svg_to_bytes' with string input."""
             try:
                 if path.lower().endswith(".svg"):
                     # Open as text string (not bytes) to satisfy the library requirement
                     with open(path, "r", encoding="utf-8") as f:
                         svg_text = f.read()
+
+                    # Same SVG at the same size always rasterizes the same: reuse an earlier PNG
+                    key = hashlib.blake2b(f"{size}:{svg_text}".encode("utf-8"), digest_size=16).hexdigest()
+                    cache_path = os.path.join(self._raster_cache_dir, key + ".png")
+                    cached = self._read_raster_cache(cache_path)
+                    if cached is not None:
+                        return cached
                     
                     # Call the confirmed method with the text string
                     png_data = resvg_py.svg_to_bytes(svg_text, width=size, height=size)
+                    self._write_raster_cache(cache_path, png_data)
 
-                    return Image.open(io.BytesIO(png_data)).convert("RGBA")
+                    # resvg_py only hands out PNG bytes (no raw pixmap); at least skip format sniffing
+                    return _as_rgba(Image.open(io.BytesIO(png_data), formats=("PNG",)))
                 
                 else:
                     # Standard PNG handling
-                    im = Image.open(path).convert("RGBA")
+                    im = Image.open(path)
+                    if im.size[1] > strip_height and im.mode in ("RGB", "RGBA", "L", "LA"):
+                        # Large (non-icon) image: integer box reduce first, so the full-size frame
+                        # is never copied to RGBA; Lanczos below only finishes the last < 2x step
+                        factor = im.size[1] // (2 * size)
+                        if factor > 1:
+                            im = im.reduce(factor)
+                    im = _as_rgba(im)
                     aspect = im.size[0] / im.size[1]
-                    return im.resize((int(size * aspect), size), Image.Resampling.LANCZOS)
+                    # reducing_gap: big sources are first shrunk by an integer factor (cheap box reduce)
+                    return im.resize((int(size * aspect), size), Image.Resampling.LANCZOS, reducing_gap=2.0)
             except Exception as e:
                 logger.error(f"Error processing {path}: {e}")
                 return None
                             
+    def _read_raster_cache(self, cache_path):
+        try:
+            with Image.open(cache_path, formats=("PNG",)) as im:
+                return _as_rgba(im)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable raster cache {cache_path}: {e}")
+            return None
+
+    def _write_raster_cache(self, cache_path, png_data):
+        # Write to a private temp file and rename, so readers (and preload threads) never see half a PNG
+        tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self._raster_cache_dir, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(bytes(png_data))
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            logger.warning(f"Could not write raster cache {cache_path}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
     def _load_icons_from_dir(self):
+        """Index the icon files by name; they are decoded lazily by _get_raw."""
         if not os.path.isdir(self.icons_dir):
             return
-        for fn in os.listdir(self.icons_dir):
-            if fn.lower().endswith((".png", ".svg")):
-                name = os.path.splitext(fn)[0].lower()
-                path = os.path.join(self.icons_dir, fn)
-                img = self._process_file(path, self.load_size)
-                if img:
-                    self._icons[name] = img
+        # scandir gets the file type from the directory read, no extra stat per file
+        with os.scandir(self.icons_dir) as it:
+            for entry in it:
+                fn = entry.name
+                if fn.lower().endswith((".png", ".svg")) and entry.is_file():
+                    self._icon_paths[os.path.splitext(fn)[0].lower()] = entry.path
+        self._matcher = None
 
-    def _download_icon(self, name):
-        """Try to fetch missing icon as SVG from Lucide CDN."""
+    def _get_raw(self, name):
+        """Decoded icon at load_size (loaded from disk on first request), or None."""
+        img = self._icons.get(name)
+        if img is None and name in self._icon_paths:
+            img = self._process_file(self._icon_paths[name], self.load_size)
+            if img:
+                self._icons[name] = img
+        return img
+
+    def preload(self, names=None):
+        """
+        Decode icons up front in parallel (all indexed icons if names is None); resvg
+        releases the GIL, so SVGs rasterize on every core. Unknown names are skipped.
+        """
+        if names is None:
+            names = list(self._icon_paths)
+        todo = []
+        for name in dict.fromkeys((n or "").lower().strip() for n in names):
+            if name in self._icon_paths and name not in self._icons:
+                todo.append((name, self._icon_paths[name]))
+        if not todo:
+            return 0
+        workers = min(os.cpu_count() or 1, len(todo))
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            images = list(ex.map(lambda item: self._process_file(item[1], self.load_size), todo))
+        for (name, _), img in zip(todo, images):
+            if img:
+                self._icons[name] = img
+        return len(todo)
+
+    def _download_target(self, name):
+        """(clean_name, url, target_path) for fetching an icon from the Lucide CDN."""
         # Replace spaces with hyphens for the URL
         clean_name = name.lower().strip().replace(" ", "-")
         url = f"https://unpkg.com/lucide-static@latest/icons/{clean_name}.svg"
-        target_path = os.path.join(self.icons_dir, f"{clean_name}.svg")
-        
+        return clean_name, url, os.path.join(self.icons_dir, f"{clean_name}.svg")
+
+    def _save_download(self, r, target_path):
+        if r.status_code == 200:
+            with open(target_path, "wb") as f:
+                f.write(r.content)
+            return target_path
+        return None
+
+    def _download_icon(self, name):
+        """Try to fetch missing icon as SVG from Lucide CDN."""
+        clean_name, url, target_path = self._download_target(name)
+        try:
+            logger.info(f"Downloading icon: {clean_name}...")
+            # httpx (HTTP/2) if installed, else the requests session
+            return self._save_download((self._http or self._session).get(url, timeout=5), target_path)
+        except Exception as e:
+            logger.error(f"Download failed for {clean_name}: {e}")
+        return None
+
+    async def _adownload_icon(self, client, name):
+        """Async twin of _download_icon on a shared httpx.AsyncClient."""
+        clean_name, url, target_path = self._download_target(name)
         try:
             logger.info(f"Downloading icon: {clean_name}...")
-            r = requests.get(url, timeout=5)
-            if r.status_code == 200:
-                with open(target_path, "wb") as f:
-                    f.write(r.content)
-                return target_path
+            return self._save_download(await client.get(url), target_path)
         except Exception as e:
             logger.error(f"Download failed for {clean_name}: {e}")
         return None
 
+    async def _adownload_many(self, names):
+        async with _httpx_client(httpx.AsyncClient, timeout=5) as client:
+            return await asyncio.gather(*(self._adownload_icon(client, n) for n in names))
+
+    def prefetch(self, names):
+        """
+        Download the icons in names that are not on disk yet, all at once
+        (httpx/asyncio if available, else PREFETCH_WORKERS threads).
+        """
+        missing = [n for n in dict.fromkeys((n or "").lower().strip() for n in names)
+                   if n and n not in self._icon_paths]
+        if not missing:
+            return 0
+        paths = None
+        if httpx is not None:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                paths = asyncio.run(self._adownload_many(missing))
+        if paths is None:
+            with ThreadPoolExecutor(max_workers=min(PREFETCH_WORKERS, len(missing))) as ex:
+                paths = list(ex.map(self._download_icon, missing))
+        for name, path in zip(missing, paths):
+            if path:
+                self._icon_paths[name] = path
+        self._matcher = None
+        return sum(1 for p in paths if p)
+
     def get_icon_image(self, name, size=None):
         if not name: return None
         name = name.lower().strip()
-        target_size = size or self.load_size
+        # int once, so 24 and 24.0 share a cache entry and resize gets integer sizes
+        target_size = int(size or self.load_size)
 
-        if name in self._icons:
-            img = self._icons[name]
+        img = self._get_raw(name)
+        if img is not None:
             if img.size[1] != target_size:
-                aspect = img.size[0] / img.size[1]
-                return img.resize((int(target_size * aspect), target_size), Image.Resampling.LANCZOS)
+                key = (name, target_size)
+                resized = self._resized.get(key)
+                if resized is None:
+                    aspect = img.size[0] / img.size[1]
+                    new_size = (int(target_size * aspect), target_size)
+                    small = max(new_size) <= SMALL_ICON_PX
+                    resample = Image.Resampling.BILINEAR if small else Image.Resampling.LANCZOS
+                    resized = img.resize(new_size, resample)
+                    self._resized[key] = resized
+                    if len(self._resized) > RESIZED_CACHE_MAX:
+                        self._resized.popitem(last=False)
+                else:
+                    self._resized.move_to_end(key)
+                return resized.copy()
             return img.copy()
 
         dl_path = self._download_icon(name)
         if dl_path:
-            img = self._process_file(dl_path, target_size)
-            if img:
-                self._icons[name] = img
-                return img
+            # Index it like a local icon; _get_raw decodes it at load_size on the retry
+            self._icon_paths[name] = dl_path
+            self._matcher = None
+            if self._get_raw(name) is not None:
+                return self.get_icon_image(name, size)
         return None
 
+    def _build_matcher(self):
+        """
+        Return match(text) -> first icon name (in load order) contained in text, or None.
+        One pass over the text with an Aho-Corasick automaton (pyahocorasick), or a
+        small trie when that isn't installed, instead of one 'in' test per icon.
+        """
+        names = [n for n in self._icon_paths.keys() if n]
+        if not names:
+            return lambda text: None
+        if ahocorasick is not None:
+            auto = ahocorasick.Automaton()
+            for i, n in enumerate(names):
+                auto.add_word(n, i)
+            auto.make_automaton()
+
+            def match(text):
+                best = None
+                for _end, i in auto.iter(text):
+                    if best is None or i < best:
+                        best = i
+                return names[best] if best is not None else None
+            return match
+
+        trie = {}
+        for i, n in enumerate(names):
+            node = trie
+            for ch in n:
+                node = node.setdefault(ch, {})
+            node.setdefault(None, i)
+
+        def match(text):
+            best = None
+            for start in range(len(text)):
+                node = trie
+                for ch in text[start:]:
+                    node = node.get(ch)
+                    if node is None:
+                        break
+                    i = node.get(None)
+                    if i is not None and (best is None or i < best):
+                        best = i
+            return names[best] if best is not None else None
+        return match
+
     def find_for_keyword(self, text, size=None):
         if not text: return None
         text_norm = text.lower()
-        if text_norm in self._icons:
+        if text_norm in self._icon_paths:
             return self.get_icon_image(text_norm, size)
-        for icon_name in self._icons.keys():
-            if icon_name in text_norm:
-                return self.get_icon_image(icon_name, size)
+        if self._matcher is None:
+            self._matcher = self._build_matcher()
+        icon_name = self._matcher(text_norm)
+        if icon_name is not None:
+            return self.get_icon_image(icon_name, size)
         return None
 
 _manager = None
@@ -7,14 +7,16 @@ Full "mock" package for developing/testing Inky Frame/Impression code on a PC.
 - Provides a tiny shim that lets you run an existing `main.py` while faking the `inky` module
   so your code doesn't need changes. Use: python inky_mock_full_package.py /path/to/your/main.py
 
-Requirements: Pillow
-    pip install pillow
+Requirements: Pillow (NumPy optional, speeds up the palette conversion in show())
+    pip install pillow numpy
 
 Features:
 - 600x448 default resolution (Inky Frame / 7.3" impression style)
 - Color palette mapping (black/white/red/yellow/green/blue)
-- clear(), set_pixel(), set_border(), set_image(), show(), display() methods
+- clear(), set_pixel(), set_pixels(), set_border(), set_image(), show(), display() methods
 - Optional dithering when converting full-color PIL images to display palette
+  (no per-pixel Python loop: Pillow's quantizer dithers; nearest-color uses a NumPy lookup
+  table, or Pillow's quantizer when NumPy is missing)
 - `--out` argument to name the generated PNG (default: preview.png)
 - When used as a runner it injects a fake `inky` and `inky.auto` module so your usual imports
   (e.g. `from inky import InkyFrame` or `from inky.auto import auto`) will work.
@@ -30,6 +32,11 @@ import types
 import argparse
 from PIL import Image, ImageDraw, ImageFont, ImageOps
 
+try:
+    import numpy as np  # optional: vectorized nearest-palette mapping
+except Exception:
+    np = None
+
 # -----------------------------
 # Mock Inky class
 # -----------------------------
@@ -60,12 +67,20 @@ class InkyMock:
         self.width = width or self.WIDTH
         self.height = height or self.HEIGHT
         self.rotation = rotation
-        self.palette = palette or dict(self.PALETTE)
+        self.palette = palette or dict(self.PALETTE)  # setter also builds _pal_img
+        # '#RRGGBB' string -> parsed RGB tuple, filled by _color
+        self._color_cache = {}
         self.dither = dither
+        # 5-bit RGB -> palette color lookup table, built on first use for the palette in _lut_key
+        self._lut = None
+        self._lut_key = None
 
         # Create white background image
         self.image = Image.new("RGB", (self.width, self.height), self.palette["white"])
         self.draw = ImageDraw.Draw(self.image)
+        # direct pixel access for set_pixel; re-fetched if self.image gets replaced
+        self._px_image = self.image
+        self._px = self.image.load()
         try:
             self._font = ImageFont.truetype("arial.ttf", 14)
         except Exception:
@@ -77,6 +92,17 @@ class InkyMock:
         # track whether an inky-style .show() was called so runner can pick up file
         self._last_filename = None
 
+    @property
+    def palette(self):
+        return self._palette
+
+    @palette.setter
+    def palette(self, value):
+        """Assign a new dict to change colors; the caches derived from it are rebuilt here."""
+        self._palette = value
+        self._pal_key = tuple(value.values())
+        self._pal_img = self._build_pal_img(list(self._pal_key))
+
     # ------------------ basic drawing API ------------------
     def clear(self, color="white"):
         rgb = self._color(color)
@@ -85,7 +111,25 @@ class InkyMock:
     def set_pixel(self, x, y, color):
         rgb = self._color(color)
         if 0 <= x < self.width and 0 <= y < self.height:
-            self.draw.point((x, y), fill=rgb)
+            if self._px_image is not self.image:
+                self._px_image = self.image
+                self._px = self.image.load()
+            self._px[x, y] = rgb
+
+    def set_pixels(self, xs, ys, color):
+        """Set many pixels to one color; xs and ys are equal-length sequences (or arrays).
+        Coordinates outside the display are skipped, like set_pixel does."""
+        rgb = self._color(color)
+        if np is None:
+            for x, y in zip(xs, ys):
+                self.set_pixel(x, y, rgb)
+            return
+        xs = np.asarray(xs, dtype=np.intp)
+        ys = np.asarray(ys, dtype=np.intp)
+        inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        arr = np.array(self.image)  # writable copy; asarray() of a PIL image is read-only
+        arr[ys[inside], xs[inside]] = rgb
+        self.image.paste(Image.fromarray(arr, self.image.mode))
 
     def get_pixel(self, x, y):
         return self.image.getpixel((x, y))
@@ -160,13 +204,21 @@ class InkyMock:
         if isinstance(color, tuple) and len(color) == 3:
             return color
         if isinstance(color, str):
+            # palette names are read live, so in-place palette edits take effect
+            rgb = self.palette.get(color)
+            if rgb is not None:
+                return rgb
+            rgb = self._color_cache.get(color)
+            if rgb is not None:
+                return rgb
             if color.lower() in self.palette:
                 return self.palette[color.lower()]
-            # hex like '#RRGGBB'
+            # hex like '#RRGGBB'; the only thing cached, since it doesn't depend on the palette
             if color.startswith("#") and len(color) == 7:
                 r = int(color[1:3], 16)
                 g = int(color[3:5], 16)
                 b = int(color[5:7], 16)
+                self._color_cache[color] = (r, g, b)
                 return (r, g, b)
         # fallback black
         return (0, 0, 0)
@@ -177,45 +229,56 @@ class InkyMock:
         """
         # Prepare palette list
         palette_colors = list(self.palette.values())
+        if tuple(palette_colors) != self._pal_key:
+            # palette dict was edited in place; the setter didn't see it
+            self._pal_key = tuple(palette_colors)
+            self._pal_img = self._build_pal_img(palette_colors)
+        pal_img = self._pal_img
+
+        if self.dither:
+            # Pillow's C quantizer: Floyd–Steinberg error diffusion onto exactly our palette
+            return img.convert('RGB').quantize(palette=pal_img, dither=Image.Dither.FLOYDSTEINBERG).convert('RGB')
+        # No dithering: direct nearest color mapping
+        return self._nearest_palette(img.convert('RGB'), palette_colors, pal_img)
+
+    @staticmethod
+    def _build_pal_img(palette_colors):
+        """1x1 'P' image carrying palette_colors, for Image.quantize(palette=...)."""
         # Create a tiny palette image that Pillow can use
         pal_img = Image.new('P', (1,1))
         # build a palette list (palettes are 768-length lists)
         flat = []
         for (r,g,b) in palette_colors:
             flat.extend([r,g,b])
-        # pad to 256 colors
-        flat += [0] * (768 - len(flat))
+        # pad to 256 colors by repeating the first color, so the padding can't add a color
+        flat += flat[:3] * (256 - len(palette_colors))
         pal_img.putpalette(flat)
+        return pal_img
 
-        # Convert original to P using this palette.
-        if self.dither:
-            converted = img.convert('RGB').convert('P', palette=Image.ADAPTIVE)
-            # Now remap by nearest palette color (we want our exact given palette)
-            converted = converted.convert('RGB')
-            remapped = Image.new('RGB', converted.size, (255,255,255))
-            pixels_in = converted.load()
-            pixels_out = remapped.load()
-            w,h = converted.size
-            for y in range(h):
-                for x in range(w):
-                    r,g,b = pixels_in[x,y]
-                    # find nearest color in our palette
-                    best = min(palette_colors, key=lambda c: (c[0]-r)**2 + (c[1]-g)**2 + (c[2]-b)**2)
-                    pixels_out[x,y] = best
-            return remapped
-        else:
-            # No dithering: direct nearest color mapping
-            src = img.convert('RGB')
-            w,h = src.size
-            out = Image.new('RGB', (w,h))
-            inpx = src.load()
-            outpx = out.load()
-            for y in range(h):
-                for x in range(w):
-                    r,g,b = inpx[x,y]
-                    best = min(palette_colors, key=lambda c: (c[0]-r)**2 + (c[1]-g)**2 + (c[2]-b)**2)
-                    outpx[x,y] = best
-            return out
+    def _nearest_palette(self, src, palette_colors, pal_img):
+        """Map every pixel of an RGB image to the nearest palette color.
+        Colors are matched on 5 bits per channel, through a lookup table.
+        """
+        if np is None:
+            # Pillow's own remap (its color cache works on slightly truncated RGB)
+            return src.quantize(palette=pal_img, dither=Image.Dither.NONE).convert('RGB')
+
+        lut = self._palette_lut(palette_colors)
+        arr = np.asarray(src) >> 3
+        return Image.fromarray(lut[arr[:, :, 0], arr[:, :, 1], arr[:, :, 2]], 'RGB')
+
+    def _palette_lut(self, palette_colors):
+        """(32,32,32,3) uint8 table: 5-bit RGB -> nearest palette color (squared distance from
+        the middle of each 8-wide bin; ties go to the earlier palette entry). Built once per palette.
+        """
+        key = tuple(palette_colors)
+        if self._lut is None or self._lut_key != key:
+            centers = np.mgrid[0:32, 0:32, 0:32].reshape(3, -1).T * 8 + 4
+            pal = np.array(palette_colors, dtype=np.int32)
+            dist = ((centers[:, None, :] - pal[None, :, :]) ** 2).sum(axis=-1)
+            self._lut = pal.astype(np.uint8)[dist.argmin(axis=1)].reshape(32, 32, 32, 3)
+            self._lut_key = key
+        return self._lut
 
 
 # -----------------------------
@@ -251,6 +314,24 @@ def make_inky_module_class(mock_cls=InkyMock):
     return m
 
 
+# (path, mtime_ns, size) -> compiled code, so reruns of an unchanged script skip compile()
+_code_cache = {}
+
+
+def _compiled_script(path_to_script):
+    st = os.stat(path_to_script)
+    key = (os.path.abspath(path_to_script), st.st_mtime_ns, st.st_size)
+    code = _code_cache.get(key)
+    if code is None:
+        with open(path_to_script, 'rb') as f:
+            code = compile(f.read(), path_to_script, 'exec')
+        # only the newest version of each script is worth keeping
+        for old in [k for k in _code_cache if k[0] == key[0]]:
+            del _code_cache[old]
+        _code_cache[key] = code
+    return code
+
+
 def run_user_script(path_to_script, out_filename='preview.png', extra_argv=None):
     """Run a Python script with the fake inky module injected.
     The script will run normally and when it calls Inky.show() the preview.png will be written.
@@ -278,9 +359,8 @@ def run_user_script(path_to_script, out_filename='preview.png', extra_argv=None)
         '__name__': '__main__',
         '__package__': None,
     }
-    with open(path_to_script, 'rb') as f:
-        code = compile(f.read(), path_to_script, 'exec')
-        exec(code, globals_dict, globals_dict)
+    code = _compiled_script(path_to_script)
+    exec(code, globals_dict, globals_dict)
 
     # restore argv
     sys.argv = old_argv
@@ -9,7 +9,7 @@ import argparse
 from pathlib import Path
 
 from data_provider import initial_fetch_all
-from layout_renderer import render_calendar
+from layout_renderer import render_calendar, ICON_NAME_MAP
 from inky_adapter import display_on_inky_if_available, save_png
 from inky_icons_package import IconManager
 from mappings import EVENT_MAPPINGS
@@ -118,6 +118,15 @@ def main(argv=None):
         print("Data fetch failed:", e)
         data = {}  # fallback to empty
 
+    # Last ned manglende ikoner og dekod dem eventene trenger parallelt før rendering
+    # (renderer henter dem ett og ett)
+    try:
+        names = {ICON_NAME_MAP.get(ev["icon"], ev["icon"]) for ev in (data.get("events") or []) if ev.get("icon")}
+        opts["icon_manager"].prefetch(names)
+        opts["icon_manager"].preload(names)
+    except Exception as e:
+        print("Icon preload failed:", e)
+
     # attach options
     render_opts = dict(opts)  # copy global opts
     render_opts["days"] = args.days
@@ -22,6 +22,13 @@ import re
 import os
 import time
 import json
+import functools
+
+try:
+    import orjson  # optional: faster JSON parsing
+    _loads = orjson.loads
+except Exception:
+    _loads = json.loads
 
 # requests is required for CSV mode; fail early with a clear message if missing
 try:
@@ -208,8 +215,8 @@ def load_cache_if_valid() -> Optional[List[Dict[str, Any]]]:
     if not os.path.exists(GS_CACHE_PATH):
         return None
     try:
-        with open(GS_CACHE_PATH, "r", encoding="utf-8") as f:
-            payload = json.load(f)
+        with open(GS_CACHE_PATH, "rb") as f:
+            payload = _loads(f.read())
         fetched_at = payload.get("meta", {}).get("fetched_at", 0)
         if time.time() - fetched_at > GS_CACHE_TTL_SECONDS:
             return None
@@ -263,6 +270,10 @@ def reload_event_mappings(force_refresh: bool = False, url: Optional[str] = None
     global EVENT_MAPPINGS, EVENT_MAPPINGS_LOADED_AT, EVENT_MAPPINGS_SOURCE
     EVENT_MAPPINGS, EVENT_MAPPINGS_SOURCE = _load_event_mappings(force_refresh=force_refresh, csv_url=url)
     EVENT_MAPPINGS_LOADED_AT = time.time()
+    # results for the old mappings are stale (not defined yet on the import-time load)
+    cached = globals().get("_apply_event_mapping_cached")
+    if cached is not None:
+        cached.cache_clear()
     print(f"[mappings] Loaded {len(EVENT_MAPPINGS)} mappings from {EVENT_MAPPINGS_SOURCE}")
 
 # convenience test helper (call from REPL)
@@ -368,8 +379,16 @@ def apply_event_mapping(summary: str):
           - 'replace_text' / 'replace_icon' -> remove first occurrence (case-insensitive)
           - 'replace_all' -> remove all occurrences (case-insensitive)
       - Build structured out dict with per-tag colors where possible.
+
+    Results are memoized per stripped summary (colors resolved once); callers get their own copy.
     """
-    original = (summary or "").strip()
+    out = dict(_apply_event_mapping_cached((summary or "").strip()))
+    out["tags"] = [dict(t) for t in out["tags"]]
+    return out
+
+
+@functools.lru_cache(maxsize=1024)
+def _apply_event_mapping_cached(original: str):
     out = {
         "display_text": original,
         "tag_text": None,
@@ -6,9 +6,32 @@
 # pip install requests
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timedelta, timezone
 import math
 
+try:
+    import orjson  # valgfri: raskere JSON-parsing enn stdlib json
+    _loads = orjson.loads
+except Exception:
+    import json
+    _loads = json.loads
+
+try:
+    import ijson  # valgfri: strøm-parse MET-svaret i stedet for å bygge hele dict-treet
+except Exception:
+    ijson = None
+
+MAX_JSON_BYTES = 5 * 1024 * 1024
+
+# Felles keep-alive-sesjon mot api.met.no og Open-Meteo (gjenbruker TLS mellom kall)
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=2, pool_maxsize=4,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504)),
+))
+
 # Default config (kan overskrives ved kall)
 DEFAULT_LAT = 59.4376
 DEFAULT_LON = 10.6432
@@ -60,10 +83,12 @@ def _deg_to_cardinal(deg):
 
 # ---------------- parse MET timeseries -------------------------------------
 def _parse_met_timeseries_json(j):
+    return _parse_met_timeseries(j.get("properties", {}).get("timeseries", []))
+
+def _parse_met_timeseries(timeseries):
+    """timeseries: any iterable of MET entries (a list, or an ijson item stream)."""
     out = {}
     hourly_today = []  # detailed hour-for-hour for current day (06-06 grouping we will slice later)
-    props = j.get("properties", {})
-    timeseries = props.get("timeseries", [])
     for t in timeseries:
         time_str = t.get("time")
         if not time_str:
@@ -176,11 +201,15 @@ def _parse_met_timeseries_json(j):
 def _fetch_met(lat, lon, user_agent=DEFAULT_USER_AGENT, timeout=20):
     headers = {"User-Agent": user_agent, "Accept": "application/json"}
     params = {"lat": str(lat), "lon": str(lon)}
-    r = requests.get(MET_URL, headers=headers, params=params, timeout=timeout)
-    if r.status_code != 200:
-        raise RuntimeError(f"MET HTTP {r.status_code}: {r.text[:400]}")
-    j = r.json()
-    return _parse_met_timeseries_json(j)
+    with _SESSION.get(MET_URL, headers=headers, params=params, timeout=timeout, stream=True) as r:
+        if r.status_code != 200:
+            raise RuntimeError(f"MET HTTP {r.status_code}: {r.text[:400]}")
+        if int(r.headers.get("Content-Length") or 0) > MAX_JSON_BYTES:
+            raise RuntimeError(f"MET response too large: {r.headers.get('Content-Length')} bytes")
+        if ijson is not None:
+            r.raw.decode_content = True
+            return _parse_met_timeseries(ijson.items(r.raw, "properties.timeseries.item", use_float=True))
+        return _parse_met_timeseries_json(_loads(r.content))
 
 def _fetch_open_meteo(lat, lon, days, timeout=15):
     params = {
@@ -189,10 +218,10 @@ def _fetch_open_meteo(lat, lon, days, timeout=15):
         "forecast_days": days,
         "timezone": "auto"
     }
-    r = requests.get(OM_URL, params=params, timeout=timeout)
+    r = _SESSION.get(OM_URL, params=params, timeout=timeout)
     if r.status_code != 200:
         raise RuntimeError(f"OpenMeteo HTTP {r.status_code}: {r.text[:400]}")
-    j = r.json()
+    j = _loads(r.content)
     out = {}
     daily = j.get("daily", {})
     dates = daily.get("time", [])